@@ -0,0 +1,319 @@
+"""Benchmark suite for the public functions in main.py.
+
+Times basic_calculator per operation, unit_converter per category,
+currency_converter, scientific_calculation (cold and cached),
+statistical_analysis and matrix_operations across sizes, and export_history
+with large histories. Results are written as JSON and compared with a stored
+baseline.
+
+Each benchmark is timed over several interleaved rounds and reported as
+the median per-call time together with its interquartile range, the
+run-to-run noise on this machine. A benchmark is flagged only when its
+median is slower than the baseline's by more than the threshold and its
+interquartile range lies wholly above the baseline's, so a slowdown that
+the noise could explain is never flagged. Small regressions on a busy
+machine therefore need more --repeat rounds to show.
+
+The comparison is a report, not a gate: on a shared machine load changes
+over minutes, so a baseline recorded earlier can still be flagged or hide a
+real slowdown. --check makes flagged benchmarks fail the run (exit status
+1); use it only on a quiet machine that also recorded the baseline.
+
+A fixed calibration workload is timed in every round as well. When its
+range does not overlap the baseline's, the machine is taken to be faster
+or slower overall and current times are scaled by the ratio of the medians
+(--no-normalize compares raw times). Benchmarks whose baseline is under
+FAST_SECONDS are held to the looser --fast-threshold. Baselines are still
+best recorded with --update-baseline on the machine that runs the
+comparison.
+
+Example:
+    python benchmarks/bench_main.py --output results.json
+    python benchmarks/bench_main.py --update-baseline
+    python benchmarks/bench_main.py --check
+    python benchmarks/bench_main.py --filter matrix --threshold 0.5 --no-normalize
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import main
+from history_store import History
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+# Baselines below this many seconds per call use the fast threshold
+FAST_SECONDS = 10e-6
+
+# Sample operands for each basic operation, valid for all of them
+BASIC_OPERANDS = {
+    '+': (12.5, 7.25), '-': (12.5, 7.25), '*': (12.5, 7.25), '/': (12.5, 7.25),
+    '^': (1.5, 7.25), '%': (12.5, 7.25), '//': (12.5, 7.25), '√': (12.5, 3.0),
+    'log': (12.5, 10.0), 'ln': (12.5, 0.0),
+}
+
+def loop_size(func, min_time=0.05):
+    """Return how many calls of func make a timed run of at least min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            return number
+        number *= 10 if elapsed < min_time / 10 else 2
+
+def time_once(func, number, setup=None):
+    """Time number calls of func and return the seconds per call.
+
+    setup, if given, runs before every call outside the timed region.
+    """
+    if setup is None:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return (time.perf_counter() - start) / number
+    total = 0.0
+    for _ in range(number):
+        setup()
+        start = time.perf_counter()
+        func()
+        total += time.perf_counter() - start
+    return total / number
+
+def calibration_workload():
+    """Return a fixed mix of interpreter and NumPy work to time."""
+    data = np.random.default_rng(1).standard_normal(100_000)
+
+    def workload():
+        total = 0.0
+        for i in range(20_000):
+            total += i * 0.5
+        np.sort(data)
+        return total
+
+    return workload
+
+def benchmarks():
+    """Yield (name, func, setup) for every benchmark in the suite."""
+    history = History(capacity=1000)
+
+    for operation, (num1, num2) in BASIC_OPERANDS.items():
+        yield (f"basic_calculator[{operation}]",
+               lambda op=operation, a=num1, b=num2: main.basic_calculator(history, a, op, b), None)
+
+    for category, choices in main.UNIT_CONVERSIONS.items():
+        choice = next(iter(choices))
+        yield (f"unit_converter[{category}]",
+               lambda c=category, ch=choice: main.unit_converter(history, c, 42.0, ch), None)
+    yield ("unit_converter[Length,result]",
+           lambda: main.unit_converter(history, 'Length', 42.0, 'Meters to Feet', as_result=True), None)
+
+    yield ("currency_converter",
+           lambda: main.currency_converter(history, 100.0, 'USD', 'EUR'), None)
+    yield ("currency_converter[result]",
+           lambda: main.currency_converter(history, 100.0, 'USD', 'EUR', as_result=True), None)
+
+    expression = "sin(x)**2 + x*exp(x)"
+    yield ("scientific_calculation[cold]",
+           lambda: main.scientific_calculation(expression),
+           lambda: main.configure_scientific_cache())
+    yield ("scientific_calculation[cached]",
+           lambda: main.scientific_calculation(expression), None)
+
+    rng = np.random.default_rng(0)
+    for size in (1_000, 100_000, 1_000_000):
+        numbers = rng.standard_normal(size)
+        yield (f"statistical_analysis[{size}]",
+               lambda data=numbers: main.statistical_analysis(data), None)
+
+    for dim in (10, 100, 300):
+        a = rng.standard_normal((dim, dim))
+        b = rng.standard_normal((dim, dim))
+
+        def run(a=a, b=b):
+            # Forget the previous engine so every call does the full work
+            main.clear_matrix_cache()
+            main.matrix_operations(a, b)
+        yield (f"matrix_operations[{dim}x{dim}]", run, None)
+
+    directory = tempfile.mkdtemp(prefix="bench_main_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    for entries in (10_000, 100_000):
+        large_history = History(capacity=entries)
+        for i in range(entries):
+            large_history.record(main.KIND_CALC, '+', (i, i + 1), 2 * i + 1)
+        path = os.path.join(directory, f"history_{entries}.txt")
+        yield (f"export_history[{entries}]",
+               lambda h=large_history, p=path: main.export_history(h, p), None)
+
+def run_suite(name_filter=None, repeat=5, min_time=0.05):
+    """Time every benchmark, interleaving the repeats across the suite.
+
+    Each round runs every benchmark once, so a burst of load on the machine
+    spoils one round of many benchmarks rather than every run of one. The
+    calibration workload runs in every round too, so it sees the same load.
+    Returns (results, calibration), each timing a spread() dict.
+    """
+    workload = calibration_workload()
+    suite = [(None, workload, None, loop_size(workload, min_time))]
+    for name, func, setup in benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        if setup is not None:
+            setup()
+        func()  # warm up caches and lazy imports
+        number = 1 if setup is not None else loop_size(func, min_time)
+        suite.append((name, func, setup, number))
+
+    timings = {name: [] for name, _, _, _ in suite}
+    for _ in range(repeat):
+        for name, func, setup, number in suite:
+            timings[name].append(time_once(func, number, setup))
+
+    results = {}
+    for name, _, _, number in suite[1:]:
+        results[name] = dict(spread(timings[name]), number=number, repeat=repeat)
+        print(f"{name:<36} {results[name]['seconds'] * 1e6:>12.2f} us "
+              f"(IQR {results[name]['low'] * 1e6:.2f}-{results[name]['high'] * 1e6:.2f})")
+    return results, spread(timings[None])
+
+def spread(timings):
+    """Median, quartiles and best of a list of per-call times, in seconds."""
+    if len(timings) > 1:
+        low, _, high = statistics.quantiles(timings, n=4, method='inclusive')
+    else:
+        low = high = timings[0]
+    return {'seconds': statistics.median(timings), 'low': low, 'high': high, 'best': min(timings)}
+
+def calibration_speed(baseline, calibration):
+    """Factor to scale current times by, or 1.0 if the calibrations overlap.
+
+    baseline and calibration are spread() dicts of the calibration workload.
+    """
+    if not isinstance(baseline, dict) or 'low' not in baseline:
+        # Older baselines stored a single calibration time
+        return 1.0
+    if calibration['high'] < baseline['low'] or calibration['low'] > baseline['high']:
+        return baseline['seconds'] / calibration['seconds']
+    return 1.0
+
+def metadata(calibration):
+    return {
+        'calibration': calibration,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def compare(results, baseline, threshold, speed=1.0, fast_threshold=None):
+    """Print the change against the baseline and return the names that regressed.
+
+    speed is the baseline's calibration time over this run's; current times
+    are multiplied by it so a uniformly slower machine does not fail. A
+    benchmark regresses when its median is more than threshold slower and
+    its interquartile range lies above the baseline's. fast_threshold, if
+    given, applies instead of threshold to benchmarks whose baseline is
+    under FAST_SECONDS.
+    """
+    regressions = []
+    if speed != 1.0:
+        print(f"\nScaling current times by {speed:.3f} from the calibration workload")
+    print(f"\n{'benchmark':<36} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<36} {'-':>12} {result['seconds'] * 1e6:>12.2f} {'new':>8}")
+            continue
+        ratio = result['seconds'] * speed / previous['seconds']
+        allowed = threshold
+        if fast_threshold is not None and previous['seconds'] < FAST_SECONDS:
+            allowed = fast_threshold
+        # Baselines from before the quartiles were stored compare medians only
+        above_noise = result['low'] * speed > previous.get('high', previous['seconds'])
+        flag = ""
+        if ratio > 1 + allowed:
+            flag = "  REGRESSION" if above_noise else "  (within noise)"
+        print(f"{name:<36} {previous['seconds'] * 1e6:>12.2f} "
+              f"{result['seconds'] * 1e6:>12.2f} {ratio - 1:>+8.1%}{flag}")
+        if flag == "  REGRESSION":
+            regressions.append(name)
+    return regressions
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the public functions in main.py.")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before failing, as a fraction (0.25 = 25%%)")
+    parser.add_argument("--fast-threshold", type=float, default=0.5,
+                        help="allowed slowdown for benchmarks under 10 us per call (0.5 = 50%%)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=9,
+                        help="timed rounds over the suite; more rounds narrow the noise band")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 when any benchmark is flagged as slower")
+    parser.add_argument("--normalize", action=argparse.BooleanOptionalAction, default=True,
+                        help="scale by the calibration workload when comparing with the baseline "
+                             "(default; --no-normalize compares raw times)")
+    args = parser.parse_args(argv)
+
+    results, calibration = run_suite(args.filter, args.repeat)
+    report = {'meta': metadata(calibration), 'results': results}
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                stored = json.load(file)
+            # A filtered run only replaces the benchmarks it ran
+            stored['results'].update(results)
+            results = stored['results']
+        with open(args.baseline, "w") as file:
+            json.dump({'meta': metadata(calibration), 'results': results}, file, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    speed = 1.0
+    if args.normalize:
+        speed = calibration_speed(baseline['meta'].get('calibration', {}), calibration)
+    regressions = compare(results, baseline['results'], args.threshold, speed, args.fast_threshold)
+    if regressions:
+        summary = (f"{len(regressions)} benchmark(s) slower than baseline by more than "
+                   f"{args.threshold:.0%} ({args.fast_threshold:.0%} under 10 us) beyond the "
+                   f"measured noise: {', '.join(regressions)}")
+        if args.check:
+            print(f"FAIL: {summary}")
+            return 1
+        print(f"Report only (pass --check to fail): {summary}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
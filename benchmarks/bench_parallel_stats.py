@@ -0,0 +1,72 @@
+"""Scaling benchmark for parallel sharded statistics.
+
+Times streaming_stats.parallel_stats over a random float64 array (or a raw
+binary file) with an increasing number of worker processes and reports the
+speedup over one process. Use --min-efficiency to fail when the speedup at
+the highest process count falls below a fraction of linear scaling.
+
+Example:
+    python benchmarks/bench_parallel_stats.py --size 100000000
+    python benchmarks/bench_parallel_stats.py --path data.f64 --processes 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming_stats import parallel_stats
+
+def default_process_counts():
+    counts = []
+    n = 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    counts.append(os.cpu_count() or 1)
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure parallel statistics scaling.")
+    parser.add_argument("--size", type=int, default=20_000_000, help="number of random values")
+    parser.add_argument("--path", help="raw binary float64 file to use instead of random data")
+    parser.add_argument("--processes", type=int, nargs="+", help="process counts to try")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per process count (best is kept)")
+    parser.add_argument("--min-efficiency", type=float, default=0.0,
+                        help="fail if speedup / processes drops below this at the highest count")
+    args = parser.parse_args(argv)
+
+    data = None
+    if args.path is None:
+        data = np.random.default_rng(0).standard_normal(args.size)
+        label = f"{args.size:,} random values"
+    else:
+        label = args.path
+
+    counts = args.processes or default_process_counts()
+    print(f"parallel_stats over {label}")
+    print(f"{'processes':>9} {'seconds':>9} {'Mvalues/s':>10} {'speedup':>8}")
+
+    baseline = None
+    speedup = 1.0
+    for processes in counts:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            stats = parallel_stats(data, path=args.path, processes=processes)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        speedup = baseline / best
+        print(f"{processes:>9} {best:>9.3f} {stats.count / best / 1e6:>10.1f} {speedup:>8.2f}")
+
+    efficiency = speedup / counts[-1]
+    if efficiency < args.min_efficiency:
+        print(f"FAIL: parallel efficiency {efficiency:.2f} is below {args.min_efficiency:.2f}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
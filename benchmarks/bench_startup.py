@@ -0,0 +1,75 @@
+"""Startup-time benchmark for main.py and gui.py.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the cumulative import time of the module. Fails (exit status 1) if
+the median exceeds the budget or if any heavy scientific package is pulled
+in at import time.
+
+Example:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module gui --budget-ms 400
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that must only be imported once a feature needs them
+HEAVY_MODULES = ('numpy', 'sympy', 'scipy')
+
+def measure_import(module):
+    """Import a module in a fresh interpreter and return (cumulative us, imported names)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    cumulative = None
+    imported = set()
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cum_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(cum_us)
+    if cumulative is None:
+        raise RuntimeError(f"No import time recorded for {module}")
+    return cumulative, imported
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure and guard module import time.")
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=7, help="number of fresh interpreters")
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="maximum median cumulative import time")
+    args = parser.parse_args(argv)
+
+    timings = []
+    heavy = set()
+    for _ in range(args.runs):
+        cumulative, imported = measure_import(args.module)
+        timings.append(cumulative / 1000)
+        heavy |= imported.intersection(HEAVY_MODULES)
+
+    median = statistics.median(timings)
+    print(f"import {args.module}: median {median:.1f} ms, "
+          f"min {min(timings):.1f} ms, max {max(timings):.1f} ms over {args.runs} runs")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(sorted(heavy))}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: median import time exceeds budget of {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
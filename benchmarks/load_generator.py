@@ -0,0 +1,134 @@
+"""Load generator for the calculator service.
+
+Opens a number of keep-alive connections to service.py and sends requests
+back to back on each for a fixed duration, then reports throughput and the
+p50/p99 latency of successful requests. A request succeeds only if its
+response carries a result; error bodies (answered with 200) and 503s (the
+service shedding load) are counted separately.
+
+Example:
+    python service.py &
+    python benchmarks/load_generator.py --connections 64 --duration 10
+    python benchmarks/load_generator.py --endpoint /convert/currency --unix /tmp/calculator.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import cross_rate_table
+
+def make_payloads(endpoint, count, seed=0):
+    """Build a pool of request bodies for an endpoint."""
+    rng = random.Random(seed)
+    currencies = list(cross_rate_table()['codes'])
+    payloads = []
+    for _ in range(count):
+        if endpoint == '/calculate':
+            payload = {
+                'num1': rng.uniform(-1000, 1000),
+                'operation': rng.choice(['+', '-', '*', '/', '^', '%', '//', '√', 'log', 'ln']),
+                'num2': rng.uniform(0.5, 10),
+            }
+        elif endpoint == '/convert/unit':
+            payload = {
+                'category': 'Length',
+                'value': rng.uniform(0, 1000),
+                'choice': rng.choice(['Meters to Feet', 'Feet to Meters']),
+            }
+        elif endpoint == '/convert/currency':
+            payload = {
+                'amount': rng.uniform(0, 1000),
+                'from': rng.choice(currencies),
+                'to': rng.choice(currencies),
+            }
+        else:
+            raise ValueError(f"Unknown endpoint: {endpoint}")
+        payloads.append(json.dumps(payload).encode())
+    return payloads
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+async def client(args, payloads, deadline, latencies, counts):
+    reader, writer = await open_connection(args)
+    host = args.unix or f"{args.host}:{args.port}"
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            body = payloads[i % len(payloads)]
+            i += 1
+            request = (
+                f"POST {args.endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+
+            start = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            response = await reader.readexactly(length)
+            elapsed = time.perf_counter() - start
+
+            status = status_line.split()[1].decode()
+            if status == '200' and 'result' not in json.loads(response):
+                status = '200 error'
+            counts[status] = counts.get(status, 0) + 1
+            if status == '200':
+                latencies.append(elapsed)
+    finally:
+        writer.close()
+
+async def run(args):
+    payloads = make_payloads(args.endpoint, 1000)
+    latencies = []
+    counts = {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        client(args, payloads, deadline, latencies, counts)
+        for _ in range(args.connections)
+    ))
+    return latencies, counts, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure calculator service latency and throughput.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--endpoint", default="/calculate",
+                        choices=["/calculate", "/convert/unit", "/convert/currency"])
+    parser.add_argument("--connections", type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run")
+    args = parser.parse_args(argv)
+
+    latencies, counts, elapsed = asyncio.run(run(args))
+    total = sum(counts.values())
+    print(f"{args.endpoint}: {args.connections} connections for {elapsed:.1f} s")
+    print(f"requests:   {total} ({total / elapsed:,.0f} req/s)")
+    print(f"statuses:   {', '.join(f'{status}: {n}' for status, n in sorted(counts.items()))}")
+    if not latencies:
+        print("FAIL: no successful requests")
+        return 1
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"latency:    p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Currency metadata and code lookup shared by main and rate_store.
+
+Kept apart from main so that modules main imports lazily (rate_store) can
+use it without importing main back. Exchange rates stay in
+main.EXCHANGE_RATES, which a rate provider may replace at any time.
+"""
+
+# Digits after the decimal point of each currency's minor unit (ISO 4217);
+# currencies not listed use DEFAULT_CURRENCY_EXPONENT
+CURRENCY_EXPONENTS = {
+    'USD': 2,
+    'EUR': 2,
+    'INR': 2,
+    'GBP': 2,
+    'JPY': 0,
+    'KWD': 3,
+}
+DEFAULT_CURRENCY_EXPONENT = 2
+
+def currency_indices(currencies, index):
+    """Map a currency code, array of codes or array of indices to row indices.
+
+    index maps each upper-case code to its row, e.g. cross_rate_table()['index'].
+    """
+    import numpy as np
+    if isinstance(currencies, str):
+        code = currencies.upper()
+        if code not in index:
+            raise ValueError(f"Unsupported currency: {code}")
+        return index[code]
+
+    arr = np.asarray(currencies)
+    if arr.dtype.kind in 'iu':
+        if arr.size and (arr.min() < 0 or arr.max() >= len(index)):
+            raise ValueError("Currency index out of range!")
+        return arr
+
+    # Look up each distinct code once, then scatter the indices back
+    unique, inverse = np.unique(arr.astype(str), return_inverse=True)
+    lookup = np.empty(len(unique), dtype=np.intp)
+    for i, code in enumerate(unique):
+        code = code.upper()
+        if code not in index:
+            raise ValueError(f"Unsupported currency: {code}")
+        lookup[i] = index[code]
+    return lookup[inverse].reshape(arr.shape)
+
+def currency_exponent(code):
+    """Number of decimal places in the minor unit of a currency."""
+    return CURRENCY_EXPONENTS.get(code.upper(), DEFAULT_CURRENCY_EXPONENT)
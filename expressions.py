@@ -0,0 +1,253 @@
+"""Safe arithmetic formulas with variables, compiled once and evaluated often.
+
+A formula uses the basic calculator's operators (+, -, *, /, ^, %, //) and
+functions (sqrt, root, log, ln) over numbers and named variables, for
+example "3*(a+b)^2 / log(c, 10)". It is parsed into a Python AST, checked
+against a whitelist, constant-folded and compiled to a code object once.
+compile_formula caches compiled formulas, so repeated text skips parsing.
+"""
+import ast
+import collections
+import math
+import operator
+import threading
+
+from operations import check_operands, invalid_operands
+
+CACHE_SIZE = 256
+
+# Formula operators as (basic_calculator operation, function) pairs
+_BINARY_OPERATORS = {
+    ast.Add: ('+', operator.add),
+    ast.Sub: ('-', operator.sub),
+    ast.Mult: ('*', operator.mul),
+    ast.Div: ('/', operator.truediv),
+    ast.Pow: ('^', operator.pow),
+    ast.Mod: ('%', operator.mod),
+    ast.FloorDiv: ('//', operator.floordiv),
+}
+# Integer powers with larger exponents are folded in floating point, so a
+# formula like 9^9^9 cannot stall compilation
+_MAX_INT_EXPONENT = 1024
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+_ARGUMENT_COUNTS = {'sqrt': (1, 1), 'root': (2, 2), 'log': (1, 2), 'ln': (1, 1)}
+
+def _root(x, n):
+    check_operands('√', x, n)
+    return x ** (1 / n)
+
+def _log(x, base=10):
+    check_operands('log', x, base)
+    return math.log(x, base)
+
+def _ln(x):
+    check_operands('ln', x, None)
+    return math.log(x)
+
+def _mod(a, b):
+    check_operands('%', a, b)
+    return a % b
+
+_SCALAR_FUNCTIONS = {
+    'sqrt': lambda x: _root(x, 2),
+    'root': _root,
+    'log': _log,
+    'ln': _ln,
+}
+# a % b is compiled to _mod(a, b) so that a zero divisor reports
+# "Modulo by zero!" as basic_calculator does
+_SCALAR_NAMESPACE = dict(_SCALAR_FUNCTIONS, _mod=_mod)
+
+def _array_functions(np):
+    """NumPy versions of the formula functions; invalid inputs give NaN."""
+    def root(x, n):
+        x, n = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(n, dtype=np.float64))
+        return np.where(invalid_operands('√', x, n), np.nan, np.power(x, 1 / n))
+
+    def log(x, base=10):
+        x, base = np.asarray(x), np.asarray(base)
+        return np.where(invalid_operands('log', x, base), np.nan, np.log(x) / np.log(base))
+
+    def ln(x):
+        x = np.asarray(x)
+        return np.where(invalid_operands('ln', x, None), np.nan, np.log(x))
+
+    return {'sqrt': lambda x: root(x, 2), 'root': root, 'log': log, 'ln': ln, '_mod': np.mod}
+
+def _apply_binary(op, left, right):
+    """Evaluate a binary operator on two numbers with basic_calculator's checks."""
+    operation, function = _BINARY_OPERATORS[type(op)]
+    check_operands(operation, left, right)
+    if isinstance(op, ast.Pow) and isinstance(right, int) and abs(right) > _MAX_INT_EXPONENT:
+        left = float(left)
+    try:
+        return function(left, right)
+    except ZeroDivisionError:
+        raise ValueError("Error: Division by zero!") from None
+    except OverflowError:
+        raise ValueError("Error: Result is too large!") from None
+
+class _Validator(ast.NodeVisitor):
+    """Reject any syntax outside the formula language."""
+
+    def __init__(self):
+        self.variables = set()
+
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        self.visit(node.body)
+
+    def visit_BinOp(self, node):
+        if type(node.op) not in _BINARY_OPERATORS:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        self.visit(node.operand)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Invalid number: {node.value!r}")
+
+    def visit_Name(self, node):
+        if node.id in _SCALAR_FUNCTIONS:
+            raise ValueError(f"Function {node.id} must be called")
+        if node.id.startswith('_'):
+            raise ValueError(f"Invalid variable name: {node.id}")
+        self.variables.add(node.id)
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _ARGUMENT_COUNTS:
+            raise ValueError("Unknown function")
+        low, high = _ARGUMENT_COUNTS[node.func.id]
+        if node.keywords or not low <= len(node.args) <= high:
+            raise ValueError(f"Wrong number of arguments to {node.func.id}")
+        for arg in node.args:
+            self.visit(arg)
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Replace every sub-expression without variables by its value."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return self._constant(_apply_binary(node.op, node.left.value, node.right.value), node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            value = node.operand.value
+            return self._constant(-value if isinstance(node.op, ast.USub) else value, node)
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if all(isinstance(arg, ast.Constant) for arg in node.args):
+            function = _SCALAR_FUNCTIONS[node.func.id]
+            return self._constant(function(*(arg.value for arg in node.args)), node)
+        return node
+
+    @staticmethod
+    def _constant(value, node):
+        if isinstance(value, complex):
+            raise ValueError("Error: Result is not a real number!")
+        return ast.copy_location(ast.Constant(value), node)
+
+class _ModuloCalls(ast.NodeTransformer):
+    """Compile a % b to _mod(a, b), which checks for a zero divisor."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Mod):
+            call = ast.Call(ast.Name('_mod', ast.Load()), [node.left, node.right], [])
+            return ast.copy_location(call, node)
+        return node
+
+class Formula:
+    """A validated, constant-folded and compiled formula."""
+
+    __slots__ = ('text', 'source', 'variables', '_code')
+
+    def __init__(self, text):
+        self.text = text
+        try:
+            tree = ast.parse(text.replace('^', '**').strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid formula: {e.msg} at offset {e.offset}") from None
+        validator = _Validator()
+        validator.visit(tree)
+        tree = ast.fix_missing_locations(_ConstantFolder().visit(tree))
+        self.source = ast.unparse(tree)
+        self.variables = tuple(sorted(validator.variables))
+        tree = ast.fix_missing_locations(_ModuloCalls().visit(tree))
+        self._code = compile(tree, '<formula>', 'eval')
+
+    def __repr__(self):
+        return f"Formula({self.source!r})"
+
+    def evaluate(self, **values):
+        """Evaluate with numbers bound to the variables, raising ValueError on bad input."""
+        namespace = self._bind(values)
+        namespace.update(_SCALAR_NAMESPACE)
+        try:
+            result = eval(self._code, {'__builtins__': {}}, namespace)
+        except ZeroDivisionError:
+            raise ValueError("Error: Division by zero!") from None
+        except OverflowError:
+            raise ValueError("Error: Result is too large!") from None
+        if isinstance(result, complex):
+            raise ValueError("Error: Result is not a real number!")
+        return result
+
+    __call__ = evaluate
+
+    def evaluate_batch(self, **values):
+        """Evaluate element-wise over arrays of bindings.
+
+        Returns (result, invalid) like main.basic_calculator_batch: rows with
+        invalid inputs or non-finite results are NaN and flagged in invalid.
+        """
+        import numpy as np
+        namespace = {
+            name: np.asarray(value, dtype=np.float64)
+            for name, value in self._bind(values).items()
+        }
+        namespace.update(_array_functions(np))
+        shape = np.broadcast_shapes(*(namespace[name].shape for name in self.variables))
+        with np.errstate(all='ignore'):
+            result = eval(self._code, {'__builtins__': {}}, namespace)
+        # Formulas without variables, or constant in them, still give a full array
+        result = np.array(np.broadcast_to(result, shape), dtype=np.float64)
+        invalid = ~np.isfinite(result)
+        result[invalid] = np.nan
+        return result, invalid
+
+    def _bind(self, values):
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise ValueError(f"Missing value for: {', '.join(missing)}")
+        return {name: values[name] for name in self.variables}
+
+_CACHE = collections.OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def compile_formula(text):
+    """Return the compiled Formula for text, reusing a cached one when possible."""
+    with _CACHE_LOCK:
+        formula = _CACHE.get(text)
+        if formula is not None:
+            _CACHE.move_to_end(text)
+            return formula
+
+    formula = Formula(text)
+    with _CACHE_LOCK:
+        _CACHE[text] = formula
+        if len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return formula
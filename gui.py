@@ -1,21 +1,133 @@
+import os
 import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import filedialog
 from tkinter import messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledText
 from main import (
-    basic_calculator, unit_converter, currency_converter,
+    basic_calculator, evaluate_formula, unit_converter, currency_converter,
     view_history, clear_history, export_history,
-    change_theme, show_help, confirm_exit, THEME_LIGHT, THEME_DARK
+    change_theme, show_help, confirm_exit, THEME_LIGHT, THEME_DARK,
+    scientific_calculation, scientific_evaluate, statistical_analysis, matrix_operations
 )
-import numpy as np
-from sympy import symbols, solve, diff, integrate, simplify
-from scipy import stats
+from history_store import History, HistoryJournal
+import instrumentation
+from symbolic import DEFAULT_EVAL_CHUNK
+from tasks import TaskRunner
 
 # Global variables
-history = []
+HISTORY_JOURNAL = "history.journal"
+
+def load_history():
+    """Reload history from the journal left by the last session, if any."""
+    try:
+        return History.from_journal(HistoryJournal(HISTORY_JOURNAL, binary=True))
+    except (OSError, ValueError) as e:
+        print(f"Could not open history journal: {str(e)}")
+        return History()
+
+# Replaced by the journaled history when the application starts
+history = History()
 current_theme = THEME_LIGHT
 
+class HistoryView(ttk.Frame):
+    """Virtualized history list that only renders the rows currently visible.
+
+    Rows are fetched from the history by index as the view scrolls, and the
+    view polls for new entries so it stays current without being rebuilt.
+    """
+
+    REFRESH_MS = 500
+
+    def __init__(self, master, entries, **kwargs):
+        super().__init__(master, **kwargs)
+        self.entries = entries
+        self.offset = 0
+        self.visible_rows = 1
+        # Whether the last render showed the newest entry
+        self.at_end = True
+        self._seen_total = None
+        self._after_id = None
+
+        self.text = tk.Text(self, wrap=tk.NONE, width=50, height=15, state=tk.DISABLED)
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+        self.text.pack(side=LEFT, fill=BOTH, expand=YES)
+
+        self.line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", self._on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.bind("<Destroy>", self._on_destroy)
+        self._refresh()
+
+    def scroll(self, rows):
+        """Move the view by a number of rows."""
+        self.offset += rows
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar callback: handles 'moveto' and 'scroll' commands."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.entries))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def render(self):
+        """Redraw the visible window of rows."""
+        total = len(self.entries)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        # Judged against what is drawn now, before later entries arrive
+        self.at_end = self.offset + self.visible_rows >= total
+
+        if total:
+            rows = self.entries[self.offset:self.offset + self.visible_rows]
+            # Keep one entry per row so indices map directly to lines
+            content = "\n".join(row.replace("\n", " | ") for row in rows)
+        else:
+            content = "History is empty."
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content)
+        self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _refresh(self):
+        """Re-render when entries were added or removed since the last poll."""
+        self._after_id = None
+        state = (getattr(self.entries, 'total', None), len(self.entries))
+        if state != self._seen_total:
+            follow = self._seen_total is None or self.at_end
+            self._seen_total = state
+            if follow:
+                self.offset = len(self.entries)
+            self.render()
+        self._after_id = self.after(self.REFRESH_MS, self._refresh)
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // max(1, self.line_height))
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
 # GUI Application
 class CalculatorApp:
     def __init__(self, root):
@@ -25,7 +137,26 @@ class CalculatorApp:
         self.style.theme_use("cosmo")  # Start with light theme
         self.root.title("Ultimate Calculator and Unit Converter")
         self.root.geometry("800x600")
+        self.history_window = None
+        self.diagnostics_window = None
+        # The calculator tabs run their heavy work in worker processes, which
+        # import SymPy, NumPy and SciPy themselves; the scientific worker also
+        # solves a small expression, since SymPy loads its integration code on
+        # first use, and keeps a spare so a cancelled calculation is replaced
+        # by a warm worker
+        self.scientific_runner = TaskRunner(
+            root, preload=("main",), warmup=(scientific_calculation, ("x*sin(x)",)), spare=True
+        )
+        self.stats_runner = TaskRunner(root, preload=("main", "numpy"))
+        self.matrix_runner = TaskRunner(root, preload=("main", "scipy.linalg", "matrix_engine"))
         self.create_widgets()
+        # Start the workers once the window is on screen
+        self.root.after(500, self.start_workers)
+
+    def start_workers(self):
+        """Start the calculation workers so they are warm before the first job."""
+        for runner in (self.scientific_runner, self.stats_runner, self.matrix_runner):
+            runner.start()
 
     def create_widgets(self) -> None:
         """Create and arrange widgets in the GUI."""
@@ -59,6 +190,7 @@ class CalculatorApp:
             ("Clear History", self.clear_history, "danger", 2, 1),
             ("Export History", self.export_history, "secondary", 3, 0),
             ("Exit", self.exit_app, "danger", 3, 1),
+            ("Diagnostics", self.open_diagnostics, "secondary", 4, 0),
         ]
 
         for text, command, style, row, col in buttons:
@@ -82,6 +214,19 @@ class CalculatorApp:
         calculator_window.title("Advanced Calculator")
         calculator_window.geometry("600x800")
 
+        # Each tab runs its heavy work in its own background worker
+        scientific_runner = self.scientific_runner
+        stats_runner = self.stats_runner
+        matrix_runner = self.matrix_runner
+
+        def cancel_jobs(event):
+            # The workers stay warm for the next window; only drop this one's jobs
+            if event.widget is calculator_window:
+                for runner in (scientific_runner, stats_runner, matrix_runner):
+                    runner.cancel()
+
+        calculator_window.bind("<Destroy>", cancel_jobs, add="+")
+
         # Main frame
         main_frame = ttk.Frame(calculator_window, padding="20")
         main_frame.pack(expand=YES, fill=BOTH)
@@ -223,6 +368,61 @@ class CalculatorApp:
             padding=10
         ).pack(pady=10)
 
+        # Formula input, e.g. 3*(a+b)^2 / log(c, 10) with a=1, b=2, c=100
+        ttk.Label(
+            basic_frame,
+            text="Formula:",
+            font=("Helvetica", 12)
+        ).pack(anchor=W)
+
+        formula_entry = ttk.Entry(
+            basic_frame,
+            font=("Helvetica", 12)
+        )
+        formula_entry.pack(fill=X, pady=5)
+
+        ttk.Label(
+            basic_frame,
+            text="Variables (name=value, comma-separated):",
+            font=("Helvetica", 12)
+        ).pack(anchor=W)
+
+        variables_entry = ttk.Entry(
+            basic_frame,
+            font=("Helvetica", 12)
+        )
+        variables_entry.pack(fill=X, pady=5)
+
+        def calculate_formula():
+            try:
+                variables = {}
+                for binding in variables_entry.get().split(","):
+                    if not binding.strip():
+                        continue
+                    name, sep, value = binding.partition("=")
+                    if not sep:
+                        raise ValueError(f"Expected name=value, got '{binding.strip()}'")
+                    variables[name.strip()] = float(value)
+
+                result = evaluate_formula(history, formula_entry.get(), variables)
+
+                if isinstance(result, float) and result.is_integer():
+                    formatted_result = int(result)
+                else:
+                    formatted_result = f"{result:.6g}"
+                self.result_var.set(f"Result: {formatted_result}")
+            except Exception as e:
+                self.result_var.set(f"Error: {str(e)}")
+
+        ttk.Button(
+            basic_frame,
+            text="Evaluate Formula",
+            command=calculate_formula,
+            bootstyle="primary",
+            width=20,
+            padding=10
+        ).pack(pady=10)
+
         # === Scientific Operations Tab ===
         ttk.Label(
             scientific_frame,
@@ -252,25 +452,27 @@ class CalculatorApp:
         result_label.pack(pady=10)
 
         def calculate_scientific():
-            try:
-                expr = expr_entry.get()
-                x = symbols('x')
-                
-                # Calculate derivative
-                derivative = diff(expr, x)
-                # Calculate integral
-                integral = integrate(expr, x)
-                # Simplify expression
-                simplified = simplify(expr)
-
-                result = f"Derivative: {derivative}\n"
-                result += f"Integral: {integral}\n"
-                result += f"Simplified: {simplified}"
-                
+            expr = expr_entry.get()
+
+            def show_result(values):
+                set_scientific_busy(False)
+                result = f"Derivative: {values['derivative']}\n"
+                result += f"Integral: {values['integral']}\n"
+                result += f"Simplified: {values['simplified']}"
+
                 result_var.set(result)
                 history.append(f"Scientific calculation: {expr}\n{result}")
-            except Exception as e:
-                result_var.set(f"Error: {str(e)}")
+
+            def show_error(message):
+                set_scientific_busy(False)
+                result_var.set(f"Error: {message}")
+
+            result_var.set("Calculating...")
+            set_scientific_busy(True)
+            scientific_runner.submit(
+                scientific_calculation, (expr,),
+                on_done=show_result, on_error=show_error
+            )
 
         ttk.Button(
             scientific_frame,
@@ -279,6 +481,83 @@ class CalculatorApp:
             bootstyle="primary"
         ).pack(pady=10)
 
+        # Numeric evaluation of the expression, its derivative or its integral
+        ttk.Label(
+            scientific_frame,
+            text="Evaluate at x (numbers, or start:stop:count for a range):",
+            font=("Helvetica", 12)
+        ).pack(anchor=W)
+
+        evaluate_frame = ttk.Frame(scientific_frame)
+        evaluate_frame.pack(fill=X, pady=5)
+
+        x_entry = ttk.Entry(
+            evaluate_frame,
+            font=("Helvetica", 12)
+        )
+        x_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, 10))
+
+        form_var = tk.StringVar(value="function")
+        ttk.Combobox(
+            evaluate_frame,
+            textvariable=form_var,
+            values=["function", "derivative", "integral"],
+            state="readonly",
+            width=12
+        ).pack(side=LEFT)
+
+        def evaluate_scientific():
+            expr = expr_entry.get()
+            text = x_entry.get().strip()
+            x_values = x_range = None
+            try:
+                if ":" in text:
+                    start, stop, count = text.split(":")
+                    x_range = (float(start), float(stop), int(count))
+                    if x_range[2] < 1:
+                        raise ValueError("Count must be at least 1")
+                else:
+                    from parsing import parse_numbers
+                    x_values = parse_numbers(text)
+            except ValueError as e:
+                result_var.set(f"Error: {str(e)}")
+                return
+
+            def show_result(summary):
+                set_scientific_busy(False)
+                points = ", ".join(f"f({x:.6g})={y:.6g}" for x, y in summary['preview'][:5])
+                result = f"{form_var.get().capitalize()} at {summary['count'] + summary['non_finite']} points\n"
+                result += f"{points}\n"
+                result += f"Min: {summary['min']:.6g}, Max: {summary['max']:.6g}, Mean: {summary['mean']:.6g}"
+                if summary['non_finite']:
+                    result += f"\nUndefined at {summary['non_finite']} points"
+
+                result_var.set(result)
+                history.append(f"Scientific evaluation: {expr}\n{result}")
+
+            def show_error(message):
+                set_scientific_busy(False)
+                result_var.set(f"Error: {message}")
+
+            result_var.set("Evaluating...")
+            set_scientific_busy(True)
+            scientific_runner.submit(
+                scientific_evaluate,
+                (expr, x_values, form_var.get(), x_range, DEFAULT_EVAL_CHUNK, True),
+                on_done=show_result, on_error=show_error
+            )
+
+        ttk.Button(
+            scientific_frame,
+            text="Evaluate",
+            command=evaluate_scientific,
+            bootstyle="secondary"
+        ).pack(pady=5)
+
+        set_scientific_busy = self.create_task_controls(
+            scientific_frame, scientific_runner, lambda: result_var.set("Calculation cancelled.")
+        )
+
         # === Statistics Tab ===
         ttk.Label(
             stats_frame,
@@ -306,22 +585,37 @@ class CalculatorApp:
         )
         stats_label.pack(pady=10)
 
-        def calculate_stats():
-            try:
-                numbers = [float(x.strip()) for x in stats_entry.get().split(',')]
-                numbers = np.array(numbers)
-                
-                result = f"Mean: {np.mean(numbers):.2f}\n"
-                result += f"Median: {np.median(numbers):.2f}\n"
-                result += f"Std Dev: {np.std(numbers):.2f}\n"
-                result += f"Variance: {np.var(numbers):.2f}\n"
-                result += f"Min: {np.min(numbers):.2f}\n"
-                result += f"Max: {np.max(numbers):.2f}"
-                
+        def calculate_stats(numbers=None):
+            if numbers is None:
+                try:
+                    from parsing import parse_numbers
+                    numbers = parse_numbers(stats_entry.get())
+                except Exception as e:
+                    stats_result.set(f"Error: {str(e)}")
+                    return
+
+            def show_result(values):
+                set_stats_busy(False)
+                result = f"Mean: {values['mean']:.2f}\n"
+                result += f"Median: {values['median']:.2f}\n"
+                result += f"Std Dev: {values['std']:.2f}\n"
+                result += f"Variance: {values['var']:.2f}\n"
+                result += f"Min: {values['min']:.2f}\n"
+                result += f"Max: {values['max']:.2f}"
+
                 stats_result.set(result)
                 history.append(f"Statistical analysis:\n{result}")
-            except Exception as e:
-                stats_result.set(f"Error: {str(e)}")
+
+            def show_error(message):
+                set_stats_busy(False)
+                stats_result.set(f"Error: {message}")
+
+            stats_result.set("Analyzing...")
+            set_stats_busy(True)
+            stats_runner.submit(
+                statistical_analysis, (numbers,),
+                on_done=show_result, on_error=show_error
+            )
 
         ttk.Button(
             stats_frame,
@@ -330,6 +624,33 @@ class CalculatorApp:
             bootstyle="primary"
         ).pack(pady=10)
 
+        def load_stats_file():
+            path = filedialog.askopenfilename(
+                parent=calculator_window,
+                filetypes=[("Data files", "*.txt *.csv *.npy"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            try:
+                import numpy as np
+                from parsing import parse_file
+                numbers = np.asarray(parse_file(path))
+            except Exception as e:
+                stats_result.set(f"Error: {str(e)}")
+                return
+            calculate_stats(numbers)
+
+        ttk.Button(
+            stats_frame,
+            text="Load File...",
+            command=load_stats_file,
+            bootstyle="secondary"
+        ).pack(pady=5)
+
+        set_stats_busy = self.create_task_controls(
+            stats_frame, stats_runner, lambda: stats_result.set("Analysis cancelled.")
+        )
+
         # === Matrix Operations Tab ===
         ttk.Label(
             matrix_frame,
@@ -340,7 +661,7 @@ class CalculatorApp:
         # Matrix A input
         ttk.Label(
             matrix_frame,
-            text="Enter Matrix A (comma-separated rows, semicolon between rows):",
+            text="Enter Matrix A (comma-separated rows, semicolon between rows) or a file path:",
             font=("Helvetica", 12)
         ).pack(anchor=W)
 
@@ -353,7 +674,7 @@ class CalculatorApp:
         # Matrix B input
         ttk.Label(
             matrix_frame,
-            text="Enter Matrix B (same format):",
+            text="Enter Matrix B (same format or a file path):",
             font=("Helvetica", 12)
         ).pack(anchor=W)
 
@@ -363,6 +684,25 @@ class CalculatorApp:
         )
         matrix_b_entry.pack(fill=X, pady=5)
 
+        # Only the selected operations are computed
+        operations_frame = ttk.Frame(matrix_frame)
+        operations_frame.pack(fill=X, pady=5)
+        matrix_operation_vars = {}
+        for name, label, default in (
+            ('addition', "A + B", True),
+            ('multiplication', "A × B", True),
+            ('det_a', "det(A)", True),
+            ('inverse_a', "inv(A)", True),
+            ('solve', "Solve A X = B", False),
+        ):
+            var = tk.BooleanVar(value=default)
+            matrix_operation_vars[name] = var
+            ttk.Checkbutton(
+                operations_frame,
+                text=label,
+                variable=var
+            ).pack(side=LEFT, padx=5)
+
         matrix_result = tk.StringVar()
         matrix_label = ttk.Label(
             matrix_frame,
@@ -373,26 +713,97 @@ class CalculatorApp:
 
         def parse_matrix(text):
             """Convert string input to numpy matrix."""
-            rows = text.strip().split(';')
-            return np.array([
-                [float(x.strip()) for x in row.split(',')]
-                for row in rows
-            ])
+            from parsing import parse_matrix as parse
+            return parse(text)
+
+        def matrix_input(entry):
+            """Return the entry's file path for the worker to load, or its parsed matrix."""
+            text = entry.get().strip()
+            if os.path.isfile(text):
+                # Large and sparse files are loaded in the worker, not sent through the pipe
+                return text
+            return parse_matrix(text)
+
+        def format_matrix(summary):
+            """Show small results in full and large or sparse ones as a summary."""
+            if 'values' in summary:
+                return str(summary['values'])
+            if len(summary['shape']) == 1:
+                return (
+                    f"Vector of {summary['shape'][0]}, nnz={summary['nnz']}, "
+                    f"norm={summary['fro_norm']:.6g}"
+                )
+            rows, cols = summary['shape']
+            kind = "sparse" if summary['sparse'] else "dense"
+            return (
+                f"{rows} x {cols} {kind}, nnz={summary['nnz']} "
+                f"(density {summary['density']:.2e})\n"
+                f"Frobenius norm={summary['fro_norm']:.6g}, "
+                f"1-norm={summary['one_norm']:.6g}, inf-norm={summary['inf_norm']:.6g}"
+            )
 
         def calculate_matrix():
+            operations = [name for name, var in matrix_operation_vars.items() if var.get()]
+            if not operations:
+                matrix_result.set("Error: Select at least one operation")
+                return
             try:
-                matrix_a = parse_matrix(matrix_a_entry.get())
-                matrix_b = parse_matrix(matrix_b_entry.get())
-                
-                result = f"Matrix Addition:\n{matrix_a + matrix_b}\n\n"
-                result += f"Matrix Multiplication:\n{matrix_a @ matrix_b}\n\n"
-                result += f"Matrix A Determinant: {np.linalg.det(matrix_a):.2f}\n"
-                result += f"Matrix A Inverse:\n{np.linalg.inv(matrix_a)}"
-                
-                matrix_result.set(result)
-                history.append(f"Matrix operations:\n{result}")
+                matrix_a = matrix_input(matrix_a_entry)
+                # B is only needed by the operations that combine A and B
+                matrix_b = None
+                if matrix_b_entry.get().strip() or set(operations) - {'det_a', 'inverse_a'}:
+                    matrix_b = matrix_input(matrix_b_entry)
             except Exception as e:
                 matrix_result.set(f"Error: {str(e)}")
+                return
+
+            def show_result(values):
+                set_matrix_busy(False)
+                sections = []
+                if 'addition' in values:
+                    sections.append(f"Matrix Addition:\n{format_matrix(values['addition'])}\n")
+                if 'multiplication' in values:
+                    sections.append(f"Matrix Multiplication:\n{format_matrix(values['multiplication'])}\n")
+                if 'det_a' in values:
+                    sections.append(f"Matrix A Determinant: {values['det_a']:.2f}")
+                if 'inverse_a' in values:
+                    sections.append(f"Matrix A Inverse:\n{format_matrix(values['inverse_a'])}")
+                if 'solve' in values:
+                    sections.append(f"Solution X of A X = B:\n{format_matrix(values['solve'])}")
+                result = "\n".join(sections)
+
+                matrix_result.set(result)
+                history.append(f"Matrix operations:\n{result}")
+
+            def show_error(message):
+                set_matrix_busy(False)
+                matrix_result.set(f"Error: {message}")
+
+            matrix_result.set("Calculating...")
+            set_matrix_busy(True)
+            matrix_runner.submit(
+                matrix_operations, (matrix_a, matrix_b, operations, True),
+                on_done=show_result, on_error=show_error
+            )
+
+        def load_matrix_file(entry):
+            path = filedialog.askopenfilename(
+                parent=calculator_window,
+                filetypes=[("Matrix files", "*.npy *.npz *.mtx *.txt *.csv"), ("All files", "*.*")]
+            )
+            if path:
+                entry.delete(0, END)
+                entry.insert(0, path)
+
+        load_frame = ttk.Frame(matrix_frame)
+        load_frame.pack(pady=5)
+        for text, entry in (("Load A...", matrix_a_entry), ("Load B...", matrix_b_entry)):
+            ttk.Button(
+                load_frame,
+                text=text,
+                command=lambda entry=entry: load_matrix_file(entry),
+                bootstyle="secondary"
+            ).pack(side=LEFT, padx=5)
 
         ttk.Button(
             matrix_frame,
@@ -401,6 +812,49 @@ class CalculatorApp:
             bootstyle="primary"
         ).pack(pady=10)
 
+        set_matrix_busy = self.create_task_controls(
+            matrix_frame, matrix_runner, lambda: matrix_result.set("Calculation cancelled.")
+        )
+
+    def create_task_controls(self, parent, runner, on_cancel):
+        """Add a busy indicator and Cancel button for a tab's background jobs.
+
+        Returns a function that switches the busy state on or off.
+        """
+        controls_frame = ttk.Frame(parent)
+        controls_frame.pack(fill=X, pady=5)
+
+        progress = ttk.Progressbar(
+            controls_frame,
+            mode="indeterminate",
+            bootstyle="info-striped"
+        )
+        progress.pack(side=LEFT, fill=X, expand=YES, padx=(0, 10))
+
+        cancel_button = ttk.Button(
+            controls_frame,
+            text="Cancel",
+            bootstyle="danger-outline",
+            state=DISABLED
+        )
+        cancel_button.pack(side=RIGHT)
+
+        def set_busy(busy):
+            if busy:
+                progress.start(10)
+                cancel_button.configure(state=NORMAL)
+            else:
+                progress.stop()
+                cancel_button.configure(state=DISABLED)
+
+        def cancel():
+            if runner.cancel():
+                set_busy(False)
+                on_cancel()
+
+        cancel_button.configure(command=cancel)
+        return set_busy
+
     def open_unit_converter(self):
         """Open the unit converter window with inline results."""
         unit_converter_window = ttk.Toplevel(self.root)
@@ -687,21 +1141,91 @@ class CalculatorApp:
         if self.root is None:
             raise RuntimeError("Root window is null")
 
-        history_window = ttk.Toplevel(self.root)
-        history_window.title("History")
-        history_window.geometry("400x300")
+        # Reuse the open window; it keeps itself up to date
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
 
-        history_text = ScrolledText(history_window, wrap=tk.WORD, width=50, height=15)
-        history_text.pack(pady=10)
+        try:
+            history_window = ttk.Toplevel(self.root)
+            history_window.title("History")
+            history_window.geometry("400x300")
 
-        if not history:
-            history_text.insert(tk.END, "History is empty.\n")
-        else:
-            try:
-                for entry in history:
-                    history_text.insert(tk.END, entry + "\n")
-            except Exception as e:
-                messagebox.showerror("Error", f"An error occurred while displaying history: {str(e)}")
+            HistoryView(history_window, history).pack(fill=BOTH, expand=YES, pady=10)
+            self.history_window = history_window
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred while displaying history: {str(e)}")
+
+    def open_diagnostics(self):
+        """Open a window with call counts and latencies of the core functions."""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+
+        window = ttk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("700x400")
+        self.diagnostics_window = window
+
+        controls = ttk.Frame(window, padding=10)
+        controls.pack(fill=X)
+
+        enabled_var = tk.BooleanVar(value=instrumentation.is_enabled())
+
+        def toggle():
+            if enabled_var.get():
+                instrumentation.enable()
+            else:
+                instrumentation.disable()
+
+        ttk.Checkbutton(
+            controls,
+            text="Record timings",
+            variable=enabled_var,
+            command=toggle
+        ).pack(side=LEFT, padx=5)
+
+        def save_json():
+            path = filedialog.asksaveasfilename(
+                parent=window,
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json")]
+            )
+            if path:
+                try:
+                    instrumentation.dump_json(path)
+                except OSError as e:
+                    messagebox.showerror("Error", f"Failed to save diagnostics: {str(e)}")
+
+        ttk.Button(controls, text="Reset", command=instrumentation.reset,
+                   bootstyle="secondary").pack(side=RIGHT, padx=5)
+        ttk.Button(controls, text="Save JSON...", command=save_json,
+                   bootstyle="secondary").pack(side=RIGHT, padx=5)
+
+        text = tk.Text(window, font=("Courier", 10), wrap="none", state="disabled")
+        text.pack(fill=BOTH, expand=YES, padx=10, pady=(0, 10))
+
+        def refresh():
+            if not window.winfo_exists():
+                return
+            lines = [f"{'function':<24} {'label':<12} {'calls':>8} {'errors':>7} "
+                     f"{'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}"]
+            for name, entry in instrumentation.snapshot()['functions'].items():
+                rows = [("all", entry['all'])] + list(entry['labels'].items())
+                for label, stats in rows:
+                    lines.append(
+                        f"{name:<24} {label:<12} {stats['count']:>8} {stats['errors']:>7} "
+                        f"{stats['mean_ms']:>9.3f} {stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f}"
+                    )
+            if len(lines) == 1:
+                lines.append("No calls recorded yet. Tick \"Record timings\" to start.")
+            text.configure(state="normal")
+            text.delete("1.0", END)
+            text.insert("1.0", "\n".join(lines))
+            text.configure(state="disabled")
+            window.after(1000, refresh)
+
+        refresh()
 
     def clear_history(self):
         """Clear the history."""
@@ -752,6 +1276,8 @@ class CalculatorApp:
 
     def exit_app(self):
         """Exit the application."""
+        for runner in (self.scientific_runner, self.stats_runner, self.matrix_runner):
+            runner.shutdown()
         try:
             self.root.quit()
             self.root.destroy()
@@ -762,6 +1288,7 @@ class CalculatorApp:
 # Run the GUI Application
 if __name__ == "__main__":
     try:
+        history = load_history()
         # Create the root window with ttkbootstrap
         root = ttk.Window(themename="cosmo")
         app = CalculatorApp(root)
@@ -0,0 +1,516 @@
+"""Bounded, compact store for calculation and conversion history.
+
+Entries are kept as typed records in preallocated arrays: a kind byte, an
+index into a table of interned labels (operation, units or currencies) and
+three float values. Strings are rendered only when an entry is read, and the
+store keeps at most `capacity` entries, dropping the oldest first.
+
+History behaves like a list of strings for iteration, indexing, len(),
+append() and clear(), so it can be passed anywhere a plain history list is
+accepted.
+
+A HistoryJournal can be attached to stream every new entry to an append-only
+file, either as text lines or as compact binary records, so history survives
+a crash. Exporting writes the entries the history holds; while the journal
+holds exactly those entries it is copied instead of rewritten.
+"""
+import atexit
+import json
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from collections import deque
+
+from results import (
+    format_calculation, format_unit_conversion, format_currency_conversion
+)
+
+# Entry kinds, stored in the low bits of the kind byte
+KIND_TEXT = 0
+KIND_CALC = 1
+KIND_UNIT = 2
+KIND_CURRENCY = 3
+
+_KIND_MASK = 0x03
+# Number of operands per kind; the result always goes in the third value slot
+_OPERAND_COUNTS = {KIND_CALC: 2, KIND_UNIT: 1, KIND_CURRENCY: 1}
+# Flags recording which values were ints, so they render as they were given
+_INT_FLAGS = (0x04, 0x08, 0x10)
+
+# Largest int that converts to float without losing precision
+_MAX_EXACT_INT = 2 ** 53
+
+DEFAULT_CAPACITY = 10000
+
+# Binary journal layout: a magic header followed by tagged records
+_JOURNAL_MAGIC = b"CALCHJ1\n"
+_REC_LABEL = 1   # label id (I), byte length (I), JSON-encoded label
+_REC_VALUES = 2  # flags (B), label id (I), three float values (3d)
+_REC_TEXT = 3    # byte length (I), UTF-8 text
+_HEADER = struct.Struct("<B")
+_LABEL = struct.Struct("<II")
+_VALUES = struct.Struct("<BI3d")
+_TEXT = struct.Struct("<I")
+
+DEFAULT_FLUSH_EVERY = 64
+
+# A journal holding more than this many times the history capacity is
+# rewritten with just the kept entries when it is loaded
+COMPACT_FACTOR = 2
+
+class HistoryEntry:
+    """A single decoded history record."""
+
+    __slots__ = ('kind', 'label', 'operands', 'result', 'text')
+
+    def __init__(self, kind, label=None, operands=(), result=None, text=None):
+        self.kind = kind
+        self.label = label
+        self.operands = operands
+        self.result = result
+        self.text = text
+
+    def __str__(self):
+        if self.kind == KIND_TEXT:
+            return self.text
+        if self.kind == KIND_CALC:
+            return format_calculation(self.label, *self.operands, self.result)
+        if self.kind == KIND_UNIT:
+            return format_unit_conversion(*self.label, *self.operands, self.result)
+        return format_currency_conversion(*self.label, *self.operands, self.result)
+
+    def __repr__(self):
+        return f"HistoryEntry({str(self)!r})"
+
+def _is_compact(value):
+    """True if value round-trips exactly through a float slot."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT
+    return isinstance(value, float)
+
+def _pack_values(kind, operands, result):
+    """Return the flags byte and three value slots for a typed entry."""
+    values = (tuple(operands) + (0.0, 0.0))[:2] + (result,)
+    flags = kind
+    for flag, value in zip(_INT_FLAGS, values):
+        if isinstance(value, int):
+            flags |= flag
+    return flags, values
+
+def _decode_values(flags, label, values):
+    """Build a HistoryEntry from stored flags, label and three float values."""
+    kind = flags & _KIND_MASK
+    values = [
+        int(value) if flags & flag else value
+        for flag, value in zip(_INT_FLAGS, values)
+    ]
+    return HistoryEntry(kind, label, tuple(values[:_OPERAND_COUNTS[kind]]), values[2])
+
+class History:
+    """Ring buffer of typed history records with on-demand string rendering."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, journal=None):
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive!")
+        self.capacity = capacity
+        self.journal = journal
+        self._kinds = array('B', bytes(capacity))
+        self._labels = array('I', bytes(4 * capacity))
+        self._values = array('d', bytes(8 * 3 * capacity))
+        self._texts = {}
+        self._label_table = []
+        self._label_index = {}
+        self._start = 0
+        self._count = 0
+        # Number of entries ever added; lets viewers detect new entries
+        self.total = 0
+        # Number of entries in the journal, None if unknown (an attached
+        # journal may already hold entries this history never saw)
+        self._journaled = None if journal is not None else 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield str(self._decode(self._slot(i)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [str(self._decode(self._slot(i))) for i in range(*index.indices(self._count))]
+        return str(self.entry(index))
+
+    def entry(self, index):
+        """Return the HistoryEntry at index (negative indices count from the end)."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("History index out of range")
+        return self._decode(self._slot(index))
+
+    def entries(self):
+        """Iterate over all entries as HistoryEntry records, oldest first."""
+        for i in range(self._count):
+            yield self._decode(self._slot(i))
+
+    def append(self, text):
+        """Add a preformatted text entry, as with a plain history list."""
+        slot = self._next_slot()
+        self._kinds[slot] = KIND_TEXT
+        self._texts[slot] = str(text)
+        if self.journal is not None:
+            self.journal.write_text(self._texts[slot])
+            self._count_journaled()
+
+    def record(self, kind, label, operands, result):
+        """Add a typed entry without formatting it.
+
+        label is the operation for KIND_CALC, (category, from unit, to unit)
+        for KIND_UNIT and (from currency, to currency) for KIND_CURRENCY.
+        Values that cannot be stored exactly as floats (e.g. complex results)
+        are kept as rendered text instead.
+        """
+        if len(operands) != _OPERAND_COUNTS[kind]:
+            raise ValueError("Wrong number of operands for history entry!")
+        flags, values = _pack_values(kind, operands, result)
+        if not all(_is_compact(v) for v in values):
+            self.append(str(HistoryEntry(kind, label, tuple(operands), result)))
+            return
+
+        slot = self._next_slot()
+        self._kinds[slot] = flags
+        self._labels[slot] = self._intern(label)
+        base = slot * 3
+        self._values[base:base + 3] = array('d', values)
+        if self.journal is not None:
+            self.journal.write_record(flags, label, values)
+            self._count_journaled()
+
+    def clear(self):
+        """Remove all entries and truncate the journal. Interned labels are kept."""
+        self._texts.clear()
+        self._start = 0
+        self._count = 0
+        if self.journal is not None:
+            self.journal.truncate()
+            self._journaled = 0
+
+    def export(self, filename):
+        """Write the entries as a plain text history file, oldest first.
+
+        This is what View History shows: the last capacity entries, even if
+        the journal holds older ones. A journal holding exactly these
+        entries is exported directly instead of rendering them again.
+        """
+        if self.journal is not None and self._journaled == self._count:
+            self.journal.export(filename)
+            return
+        with open(filename, "w", encoding="utf-8") as file:
+            for entry in self:
+                file.write(entry + "\n")
+
+    @classmethod
+    def from_journal(cls, journal, capacity=DEFAULT_CAPACITY):
+        """Reload the most recent entries of a journal and keep appending to it.
+
+        Only the last capacity entries are decoded. A journal that has grown
+        past COMPACT_FACTOR times capacity is rewritten with just those
+        entries, so startup time stays bounded.
+        """
+        history = cls(capacity)
+        entries, total = journal.tail(capacity)
+        for entry in entries:
+            if entry.kind == KIND_TEXT:
+                history.append(entry.text)
+            else:
+                history.record(entry.kind, entry.label, entry.operands, entry.result)
+        if total > COMPACT_FACTOR * capacity:
+            journal.compact(entries)
+            total = len(entries)
+        history.journal = journal
+        history._journaled = total
+        return history
+
+    def _count_journaled(self):
+        if self._journaled is not None:
+            self._journaled += 1
+
+    def _slot(self, index):
+        return (self._start + index) % self.capacity
+
+    def _next_slot(self):
+        if self._count < self.capacity:
+            slot = self._slot(self._count)
+            self._count += 1
+        else:
+            # Full: overwrite the oldest entry
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._texts.pop(slot, None)
+        self.total += 1
+        return slot
+
+    def _intern(self, label):
+        index = self._label_index.get(label)
+        if index is None:
+            index = len(self._label_table)
+            self._label_table.append(label)
+            self._label_index[label] = index
+        return index
+
+    def _decode(self, slot):
+        flags = self._kinds[slot]
+        kind = flags & _KIND_MASK
+        if kind == KIND_TEXT:
+            return HistoryEntry(KIND_TEXT, text=self._texts[slot])
+
+        base = slot * 3
+        return _decode_values(flags, self._label_table[self._labels[slot]], self._values[base:base + 3])
+
+def _decode_label(data):
+    label = json.loads(data.decode("utf-8"))
+    return tuple(label) if isinstance(label, list) else label
+
+class HistoryJournal:
+    """Append-only file that history entries are streamed into.
+
+    Entries are buffered and written in batches of flush_every (and at
+    exit), so a crash loses at most the last partial batch. With
+    binary=True entries are stored as compact typed records; otherwise the
+    journal is plain text in the same format as an exported history.
+    """
+
+    def __init__(self, path, binary=False, flush_every=DEFAULT_FLUSH_EVERY):
+        if flush_every <= 0:
+            raise ValueError("Flush interval must be positive!")
+        self.path = path
+        self.binary = binary
+        self.flush_every = flush_every
+        self._pending = []
+        self._label_ids = {}
+        self._valid_end = 0
+        if binary:
+            self._load_labels()
+        self._file = open(path, "ab")
+        if binary and self._file.tell() > self._valid_end:
+            # Drop a record cut short by a crash so new entries follow valid data
+            self._file.truncate(self._valid_end)
+        if binary and self._file.tell() == 0:
+            self._file.write(_JOURNAL_MAGIC)
+        atexit.register(self.close)
+
+    def write_text(self, text):
+        """Queue a text entry."""
+        if self.binary:
+            data = text.encode("utf-8")
+            self._pending.append(_HEADER.pack(_REC_TEXT) + _TEXT.pack(len(data)) + data)
+        else:
+            self._pending.append((text + "\n").encode("utf-8"))
+        self._maybe_flush()
+
+    def write_record(self, flags, label, values):
+        """Queue a typed entry given its kind/int flags, label and three values."""
+        if self.binary:
+            label_id = self._label_ids.get(label)
+            if label_id is None:
+                label_id = len(self._label_ids)
+                self._label_ids[label] = label_id
+                data = json.dumps(label).encode("utf-8")
+                self._pending.append(_HEADER.pack(_REC_LABEL) + _LABEL.pack(label_id, len(data)) + data)
+            self._pending.append(_HEADER.pack(_REC_VALUES) + _VALUES.pack(flags, label_id, *values))
+        else:
+            entry = _decode_values(flags, label, values)
+            self._pending.append((str(entry) + "\n").encode("utf-8"))
+        self._maybe_flush()
+
+    def write_entry(self, entry):
+        """Queue a HistoryEntry."""
+        if entry.kind == KIND_TEXT:
+            self.write_text(entry.text)
+        else:
+            flags, values = _pack_values(entry.kind, entry.operands, entry.result)
+            self.write_record(flags, entry.label, values)
+
+    def flush(self):
+        """Write all queued entries to disk."""
+        if self._file is None:
+            return
+        if self._pending:
+            self._file.write(b"".join(self._pending))
+            self._pending.clear()
+        self._file.flush()
+
+    def close(self):
+        """Flush and close the journal file."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def truncate(self):
+        """Discard every entry in the journal."""
+        self._pending.clear()
+        self._label_ids.clear()
+        self._file.seek(0)
+        self._file.truncate()
+        if self.binary:
+            self._file.write(_JOURNAL_MAGIC)
+        self._file.flush()
+
+    def entries(self):
+        """Iterate over the journaled entries, reading the file through mmap.
+
+        Text journals are read back line by line, so multi-line entries come
+        back as several text entries; binary journals keep entries intact.
+        """
+        self.flush()
+        if not self.binary:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    yield HistoryEntry(KIND_TEXT, text=line.rstrip("\n"))
+            return
+
+        labels = {}
+        with open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size <= len(_JOURNAL_MAGIC):
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for rec_type, offset, _ in _scan_records(data):
+                    if rec_type == _REC_LABEL:
+                        label_id, label = _read_label(data, offset)
+                        labels[label_id] = label
+                    else:
+                        yield _read_entry(data, rec_type, offset, labels)
+
+    def tail(self, count):
+        """Return the last count entries and the number of entries in the journal.
+
+        Binary records are only located while scanning; just the kept
+        entries are decoded.
+        """
+        self.flush()
+        if not self.binary:
+            total = 0
+            kept = deque(maxlen=count)
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    total += 1
+                    kept.append(line)
+            return [HistoryEntry(KIND_TEXT, text=line.rstrip("\n")) for line in kept], total
+
+        labels = {}
+        with open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size <= len(_JOURNAL_MAGIC):
+                return [], 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                total = 0
+                kept = deque(maxlen=count)
+                for rec_type, offset, _ in _scan_records(data):
+                    if rec_type == _REC_LABEL:
+                        label_id, label = _read_label(data, offset)
+                        labels[label_id] = label
+                    else:
+                        total += 1
+                        kept.append((rec_type, offset))
+                entries = [_read_entry(data, rec_type, offset, labels) for rec_type, offset in kept]
+        return entries, total
+
+    def compact(self, entries):
+        """Replace the journal's contents with entries.
+
+        The new journal is written beside the old one and moved over it, so
+        a crash while compacting leaves one or the other intact.
+        """
+        self.flush()
+        self._file.close()
+        temporary = self.path + ".tmp"
+        self._file = open(temporary, "wb")
+        self._label_ids.clear()
+        if self.binary:
+            self._file.write(_JOURNAL_MAGIC)
+        for entry in entries:
+            self.write_entry(entry)
+        self.flush()
+        self._file.close()
+        os.replace(temporary, self.path)
+        self._file = open(self.path, "ab")
+
+    def export(self, filename):
+        """Write the journal as a plain text history file."""
+        self.flush()
+        if not self.binary:
+            shutil.copyfile(self.path, filename)
+            return
+        with open(filename, "w", encoding="utf-8") as file:
+            for entry in self.entries():
+                file.write(str(entry) + "\n")
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def _load_labels(self):
+        """Read the label table of an existing binary journal before appending.
+
+        Also finds where the last complete record ends, in case the file
+        ends with a record cut short by a crash.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as file:
+            if file.read(len(_JOURNAL_MAGIC)) != _JOURNAL_MAGIC:
+                raise ValueError(f"Not a binary history journal: {self.path}")
+            self._valid_end = len(_JOURNAL_MAGIC)
+            if os.fstat(file.fileno()).st_size == len(_JOURNAL_MAGIC):
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for rec_type, offset, end in _scan_records(data):
+                    if rec_type == _REC_LABEL:
+                        label_id, label = _read_label(data, offset)
+                        self._label_ids[label] = label_id
+                    self._valid_end = end
+
+def _scan_records(data):
+    """Yield (record type, offset of its fields, end offset) from a mapped binary journal.
+
+    Scanning stops at a record that is cut short or of unknown type, which
+    is what a crash in the middle of a write leaves at the end of the file.
+    """
+    if data[:len(_JOURNAL_MAGIC)] != _JOURNAL_MAGIC:
+        raise ValueError("Not a binary history journal!")
+    offset = len(_JOURNAL_MAGIC)
+    size = len(data)
+    while offset + _HEADER.size <= size:
+        (rec_type,) = _HEADER.unpack_from(data, offset)
+        fields = offset + _HEADER.size
+        if rec_type == _REC_VALUES:
+            end = fields + _VALUES.size
+        elif rec_type == _REC_LABEL and fields + _LABEL.size <= size:
+            end = fields + _LABEL.size + _LABEL.unpack_from(data, fields)[1]
+        elif rec_type == _REC_TEXT and fields + _TEXT.size <= size:
+            end = fields + _TEXT.size + _TEXT.unpack_from(data, fields)[0]
+        else:
+            return
+        if end > size:
+            return
+        yield rec_type, fields, end
+        offset = end
+
+def _read_label(data, offset):
+    """Return (label id, label) of the label record whose fields start at offset."""
+    label_id, length = _LABEL.unpack_from(data, offset)
+    start = offset + _LABEL.size
+    return label_id, _decode_label(data[start:start + length])
+
+def _read_entry(data, rec_type, offset, labels):
+    """Decode the values or text record whose fields start at offset."""
+    if rec_type == _REC_VALUES:
+        flags, label_id, a, b, result = _VALUES.unpack_from(data, offset)
+        return _decode_values(flags, labels[label_id], (a, b, result))
+    (length,) = _TEXT.unpack_from(data, offset)
+    start = offset + _TEXT.size
+    return HistoryEntry(KIND_TEXT, text=data[start:start + length].decode("utf-8"))
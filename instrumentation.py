@@ -0,0 +1,189 @@
+"""Opt-in call counts, error counts and latency histograms for core functions.
+
+Functions decorated with instrumented() are timed only while
+instrumentation is enabled; when disabled the wrapper adds a single flag
+check. Enable it with enable() or by setting CALCULATOR_INSTRUMENTATION=1.
+Statistics are kept per function and per label (operation, category or
+currency pair) and read back with snapshot() or dump_json(). Labels are
+normalized and calls with invalid label values share the INVALID_LABEL
+series, so bad inputs cannot create unbounded numbers of series.
+
+Latencies go into power-of-two microsecond buckets, so recording a call is
+a few integer operations and percentiles are accurate to within a factor
+of two.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+# Bucket i counts calls that took less than 2**i microseconds (and at least
+# half that); the last bucket also holds anything slower
+BUCKETS = 32
+
+# Label of calls whose label values the normalizer rejected
+INVALID_LABEL = "invalid"
+
+_enabled = os.environ.get("CALCULATOR_INSTRUMENTATION", "") not in ("", "0")
+_lock = threading.Lock()
+# (function name, label) -> [count, errors, total_ns, min_ns, max_ns, buckets]
+_stats = {}
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _stats.clear()
+
+def _record(name, label, elapsed_ns, failed):
+    bucket = min((elapsed_ns // 1000).bit_length(), BUCKETS - 1)
+    with _lock:
+        stat = _stats.get((name, label))
+        if stat is None:
+            stat = _stats[(name, label)] = [0, 0, 0, elapsed_ns, elapsed_ns, [0] * BUCKETS]
+        stat[0] += 1
+        stat[1] += failed
+        stat[2] += elapsed_ns
+        stat[3] = min(stat[3], elapsed_ns)
+        stat[4] = max(stat[4], elapsed_ns)
+        stat[5][bucket] += 1
+
+def _label_getter(func, label, normalize=None):
+    """Return a function that extracts the label from a call's arguments."""
+    if label is None:
+        return lambda args, kwargs: None
+    names = (label,) if isinstance(label, str) else tuple(label)
+    code = func.__code__
+    parameters = code.co_varnames[:code.co_argcount]
+    positions = [parameters.index(name) for name in names]
+    if normalize is None:
+        normalize = str
+
+    def get(args, kwargs):
+        parts = []
+        for name, position in zip(names, positions):
+            value = args[position] if position < len(args) else kwargs.get(name)
+            try:
+                part = normalize(value)
+            except Exception:
+                part = None
+            if part is None:
+                return INVALID_LABEL
+            parts.append(part)
+        return "->".join(parts)
+    return get
+
+def instrumented(name, label=None, normalize=None):
+    """Decorator recording calls to the function under name.
+
+    label names the parameter (or tuple of parameters) whose value splits the
+    statistics, e.g. 'operation' or ('from_currency', 'to_currency').
+    normalize maps each value to its label text, or to None if the value is
+    invalid, in which case the call is recorded under INVALID_LABEL.
+    """
+    def decorate(func):
+        get_label = _label_getter(func, label, normalize)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            failed = True
+            start = time.perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _record(name, get_label(args, kwargs), time.perf_counter_ns() - start, failed)
+        return wrapper
+    return decorate
+
+def drain():
+    """Return the raw statistics and reset them, for sending to another process."""
+    with _lock:
+        raw = {key: [*stat[:5], list(stat[5])] for key, stat in _stats.items()}
+        _stats.clear()
+    return raw
+
+def _combine(stat, other):
+    """Fold the raw statistics other into stat in place."""
+    stat[0] += other[0]
+    stat[1] += other[1]
+    stat[2] += other[2]
+    stat[3] = min(stat[3], other[3])
+    stat[4] = max(stat[4], other[4])
+    stat[5] = [a + b for a, b in zip(stat[5], other[5])]
+
+def merge(raw):
+    """Add raw statistics from drain() in another process to this one's."""
+    with _lock:
+        for key, other in raw.items():
+            stat = _stats.get(key)
+            if stat is None:
+                _stats[key] = [*other[:5], list(other[5])]
+            else:
+                _combine(stat, other)
+
+def _percentile_ms(buckets, count, q):
+    """Upper bound of the bucket holding the q-th quantile, in milliseconds."""
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= rank and n:
+            return (1 << i) / 1000
+    return (1 << (BUCKETS - 1)) / 1000
+
+def _summary(count, errors, total, low, high, buckets):
+    return {
+        'count': count,
+        'errors': errors,
+        'total_ms': total / 1e6,
+        'mean_ms': total / count / 1e6,
+        'min_ms': low / 1e6,
+        'max_ms': high / 1e6,
+        'p50_ms': _percentile_ms(buckets, count, 0.5),
+        'p90_ms': _percentile_ms(buckets, count, 0.9),
+        'p99_ms': _percentile_ms(buckets, count, 0.99),
+        # Upper bound in microseconds -> calls, for the non-empty buckets
+        'histogram_us': {str(1 << i): n for i, n in enumerate(buckets) if n},
+    }
+
+def snapshot():
+    """Return statistics per function, overall under 'all' and per label."""
+    with _lock:
+        raw = {key: [*stat[:5], list(stat[5])] for key, stat in _stats.items()}
+
+    functions = {}
+    totals = {}
+    for (name, label), stat in sorted(raw.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        entry = functions.setdefault(name, {'all': None, 'labels': {}})
+        if label is not None:
+            entry['labels'][label] = _summary(*stat)
+        if name in totals:
+            _combine(totals[name], stat)
+        else:
+            totals[name] = [*stat[:5], list(stat[5])]
+    for name, total in totals.items():
+        functions[name]['all'] = _summary(*total)
+    return {'enabled': _enabled, 'functions': functions}
+
+def dump_json(path=None):
+    """Return the snapshot as JSON, also writing it to path if given."""
+    text = json.dumps(snapshot(), indent=2)
+    if path is not None:
+        with open(path, "w") as file:
+            file.write(text)
+    return text
@@ -1,7 +1,20 @@
 import math
-import numpy as np
-from sympy import symbols, solve, diff, integrate, simplify
-from scipy import stats
+import os
+
+from history_store import History, KIND_CALC, KIND_UNIT, KIND_CURRENCY
+from results import (
+    ConversionResult, CURRENCY_CATEGORY,
+    format_calculation, format_unit_conversion, format_currency_conversion
+)
+from symbolic import SymbolicCache, DEFAULT_EVAL_CHUNK, compile_expression
+from instrumentation import instrumented
+from operations import check_operands, invalid_operands
+from currencies import (
+    CURRENCY_EXPONENTS, DEFAULT_CURRENCY_EXPONENT, currency_exponent, currency_indices
+)
+
+# NumPy and SymPy are imported inside the functions that need them so that
+# importing this module for the basic calculator or converters stays fast.
 
 # Theme colors (ANSI escape codes)
 THEME_LIGHT = {
@@ -36,6 +49,137 @@ MPH_TO_KMH = 1 / KMH_TO_MPH
 MS_TO_KMH = 3.6
 KMH_TO_MS = 1 / MS_TO_KMH
 
+# Unit definitions: every unit maps to its category's base unit as
+# base = (value + shift) * num / den. The factors are kept as written so that
+# pair factors can be derived exactly and rounded only once.
+UNITS = {
+    'Length': {
+        'meters': (1, 1, 0),
+        'feet': (1, METERS_TO_FEET, 0),
+        'kilometers': (1000, 1, 0),
+        'miles': (1000, KILOMETERS_TO_MILES, 0),
+    },
+    'Weight': {
+        'kilograms': (1000, 1, 0),
+        'pounds': (1000, KILOGRAMS_TO_POUNDS, 0),
+        'grams': (1, 1, 0),
+        'ounces': (1, GRAMS_TO_OUNCES, 0),
+    },
+    'Temperature': {
+        'celsius': (1, 1, 0),
+        'fahrenheit': (5, 9, -32),
+        'kelvin': (1, 1, -273.15),
+    },
+    'Volume': {
+        'liters': (1000, 1, 0),
+        'gallons': (1000, LITERS_TO_GALLONS, 0),
+        'milliliters': (1, 1, 0),
+        'ounces': (1, ML_TO_OUNCES, 0),
+    },
+    'Speed': {
+        'km/h': (1, 1, 0),
+        'mph': (1, KMH_TO_MPH, 0),
+        'm/s': (MS_TO_KMH, 1, 0),
+    },
+}
+
+# Named conversion choices shown in the GUI, as (from unit, to unit) aliases
+UNIT_CONVERSIONS = {
+    'Length': {
+        'Meters to Feet': ("meters", "feet"),
+        'Feet to Meters': ("feet", "meters"),
+        'Kilometers to Miles': ("kilometers", "miles"),
+        'Miles to Kilometers': ("miles", "kilometers")
+    },
+    'Weight': {
+        'Kilograms to Pounds': ("kilograms", "pounds"),
+        'Pounds to Kilograms': ("pounds", "kilograms"),
+        'Grams to Ounces': ("grams", "ounces"),
+        'Ounces to Grams': ("ounces", "grams")
+    },
+    'Temperature': {
+        'Celsius to Fahrenheit': ("celsius", "fahrenheit"),
+        'Fahrenheit to Celsius': ("fahrenheit", "celsius"),
+        'Celsius to Kelvin': ("celsius", "kelvin")
+    },
+    'Volume': {
+        'Liters to Gallons': ("liters", "gallons"),
+        'Gallons to Liters': ("gallons", "liters"),
+        'Milliliters to Ounces': ("milliliters", "ounces"),
+        'Ounces to Milliliters': ("ounces", "milliliters")
+    },
+    'Speed': {
+        'km/h to mph': ("km/h", "mph"),
+        'mph to km/h': ("mph", "km/h"),
+        'm/s to km/h': ("m/s", "km/h"),
+        'km/h to m/s': ("km/h", "m/s")
+    }
+}
+
+def _pair_factors(a, b):
+    """Return the (scale, offset) taking unit a to unit b, each rounded once.
+
+    to = from * scale + offset, with scale = na*db / (da*nb) and
+    offset = shift_a * scale - shift_b worked out in exact integer ratios.
+    """
+    (na, da, sa), (nb, db, sb) = a, b
+    na, da, sa, nb, db, sb = (x.as_integer_ratio() for x in (na, da, sa, nb, db, sb))
+    # scale = p / q
+    p = na[0] * da[1] * db[0] * nb[1]
+    q = na[1] * da[0] * db[1] * nb[0]
+    # offset = (sa[0]*p*sb[1] - sb[0]*q*sa[1]) / (q*sa[1]*sb[1])
+    r = sa[0] * p * sb[1] - sb[0] * q * sa[1]
+    s = q * sa[1] * sb[1]
+    return p / q, r / s
+
+def _build_unit_tables(units):
+    """Precompute dense any-to-any (scale, offset) tables for each category."""
+    tables = {}
+    for category, definitions in units.items():
+        names = list(definitions)
+        pairs = [[_pair_factors(definitions[a], definitions[b]) for b in names] for a in names]
+        tables[category] = {
+            'units': names,
+            'index': {name: i for i, name in enumerate(names)},
+            'scale': [[scale for scale, _ in row] for row in pairs],
+            'offset': [[offset for _, offset in row] for row in pairs],
+        }
+    return tables
+
+UNIT_TABLES = _build_unit_tables(UNITS)
+
+# Resolved conversions keyed by (category, from unit, to unit). Only valid
+# pairs are stored, so the cache is bounded by the unit tables however many
+# spellings of a choice callers send.
+_CONVERSION_CACHE = {}
+
+def resolve_conversion(category, choice):
+    """Return (scale, offset, from unit, to unit) for a conversion choice.
+
+    Accepts the named choices in UNIT_CONVERSIONS as well as any
+    "<unit> to <unit>" pair within the category, e.g. "Kelvin to Fahrenheit".
+    """
+    if category not in UNIT_TABLES:
+        raise ValueError(f"Invalid category: {category}")
+
+    pair = UNIT_CONVERSIONS[category].get(choice)
+    if pair is None and isinstance(choice, str) and " to " in choice:
+        pair = tuple(part.strip().lower() for part in choice.split(" to ", 1))
+    if pair is None:
+        raise ValueError(f"Invalid conversion choice: {choice}")
+    key = (category,) + pair
+    resolved = _CONVERSION_CACHE.get(key)
+    if resolved is not None:
+        return resolved
+
+    table = UNIT_TABLES[category]
+    if pair[0] not in table['index'] or pair[1] not in table['index']:
+        raise ValueError(f"Invalid conversion choice: {choice}")
+    i, j = table['index'][pair[0]], table['index'][pair[1]]
+    resolved = (table['scale'][i][j], table['offset'][i][j], pair[0], pair[1])
+    _CONVERSION_CACHE[key] = resolved
+    return resolved
+
 # Exchange rates (fixed for demonstration)
 EXCHANGE_RATES = {
     'USD': 1.0,
@@ -44,9 +188,63 @@ EXCHANGE_RATES = {
     'GBP': 0.73,
 }
 
+# Cross-rate matrix derived from EXCHANGE_RATES, rebuilt when the rates change
+_CROSS_RATES = {'key': None, 'codes': (), 'index': {}, 'matrix': None}
+
+# Background refresher installed by use_rate_provider
+_RATE_CACHE = None
+
+# Rates are taken to this many decimal places for minor-unit conversions
+RATE_DECIMALS = 6
+ROUNDING_MODES = ('half_even', 'half_up', 'down')
+
+# Integer cross-rate fractions derived from EXCHANGE_RATES, rebuilt with them
+_MINOR_RATES = {'key': None}
+
+# Cache for scientific_calculation; set CALCULATOR_SYMBOLIC_CACHE to a file
+# path to keep results across sessions
+_SCIENTIFIC_CACHE = SymbolicCache(path=os.environ.get("CALCULATOR_SYMBOLIC_CACHE"))
+
+# (fingerprint of A, Factorization) for the most recent matrix A, so repeated
+# calls reuse its factorization; cleared by clear_matrix_cache
+_LAST_FACTORIZATION = None
+
 # 1. Add missing current_theme initialization at the top
 current_theme = THEME_LIGHT
 
+def _add_to_history(history, kind, label, operands, result, text=None):
+    """Record an entry compactly in a History store, or as a string in a list.
+
+    text is the entry already formatted by the caller, if it has it, so a
+    list history does not format it a second time.
+    """
+    if isinstance(history, History):
+        history.record(kind, label, operands, result)
+    elif text is not None:
+        history.append(text)
+    elif kind == KIND_CALC:
+        history.append(format_calculation(label, *operands, result))
+    elif kind == KIND_UNIT:
+        history.append(format_unit_conversion(*label, *operands, result))
+    else:
+        history.append(format_currency_conversion(*label, *operands, result))
+
+# Operations accepted by basic_calculator
+BASIC_OPERATIONS = ('+', '-', '*', '/', '^', '%', '//', '√', 'log', 'ln')
+
+# Instrumentation labels: the validated, normalized value, or None so that
+# invalid inputs share one series
+def _operation_label(operation):
+    return operation if operation in BASIC_OPERATIONS else None
+
+def _category_label(category):
+    return category if category in UNIT_TABLES else None
+
+def _currency_label(currency):
+    code = currency.upper()
+    return code if code in EXCHANGE_RATES else None
+
+@instrumented('basic_calculator', label='operation', normalize=_operation_label)
 def basic_calculator(history, num1, operation, num2):
     """Perform basic calculations."""
     try:
@@ -54,8 +252,9 @@ def basic_calculator(history, num1, operation, num2):
         if not isinstance(num1, (int, float)) or not isinstance(num2, (int, float)):
             raise ValueError("Numbers must be numeric values!")
         
-        if operation not in ['+', '-', '*', '/', '^', '%', '//', '√', 'log', 'ln']:
+        if operation not in BASIC_OPERATIONS:
             raise ValueError("Invalid operation!")
+        check_operands(operation, num1, num2)
 
         # Perform calculation based on operation
         if operation == '+':
@@ -65,51 +264,25 @@ def basic_calculator(history, num1, operation, num2):
         elif operation == '*':
             result = num1 * num2
         elif operation == '/':
-            if num2 == 0:
-                raise ValueError("Error: Division by zero!")
             result = num1 / num2
         elif operation == '^':
             result = num1 ** num2
         elif operation == '%':
-            if num2 == 0:
-                raise ValueError("Error: Modulo by zero!")
             result = num1 % num2
         elif operation == '//':
-            if num2 == 0:
-                raise ValueError("Error: Division by zero!")
             result = num1 // num2
         elif operation == '√':
             # num1 is the number, num2 is the root
-            if num2 == 0:
-                raise ValueError("Error: Root cannot be zero!")
-            if num1 < 0 and num2 % 2 == 0:
-                raise ValueError("Error: Even root of negative number!")
             result = num1 ** (1/num2)
         elif operation == 'log':
-            if num1 <= 0 or num2 <= 0:
-                raise ValueError("Error: Logarithm inputs must be positive!")
-            if num2 == 1:
-                raise ValueError("Error: Log base cannot be 1!")
             result = math.log(num1, num2)  # num2 is the base
         elif operation == 'ln':
-            if num1 <= 0:
-                raise ValueError("Error: Natural log input must be positive!")
             result = math.log(num1)  # num2 is ignored for natural log
         else:
             raise ValueError("Invalid operation!")
 
-        # Format the operation string based on the operator
-        if operation == 'log':
-            operation_str = f"log base {num2} of {num1} = {result}"
-        elif operation == 'ln':
-            operation_str = f"ln({num1}) = {result}"
-        elif operation == '√':
-            operation_str = f"{num2}√{num1} = {result}"
-        else:
-            operation_str = f"{num1} {operation} {num2} = {result}"
-
         # Add to history
-        history.append(operation_str)
+        _add_to_history(history, KIND_CALC, operation, (num1, num2), result)
         
         return result
     except ValueError as e:
@@ -117,68 +290,167 @@ def basic_calculator(history, num1, operation, num2):
     except Exception as e:
         raise Exception(f"Error: {str(e)}")
 
-def unit_converter(history, category, value, choice):
-    """Convert between various units."""
+def evaluate_formula(history, formula, variables=None):
+    """Evaluate a formula such as "3*(a+b)^2 / log(c, 10)" with variable values.
+
+    The formula is compiled once and cached, so evaluating it again with
+    other values skips parsing.
+    """
+    from expressions import compile_formula
+    compiled = compile_formula(formula)
+    variables = variables or {}
+    for name, value in variables.items():
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"Value of {name} must be numeric!")
+    result = compiled.evaluate(**variables)
+
+    bindings = ", ".join(f"{name}={variables[name]}" for name in compiled.variables)
+    history.append(f"{formula} = {result}" + (f" ({bindings})" if bindings else ""))
+    return result
+
+def evaluate_formula_batch(formula, variables, history=None):
+    """Evaluate a compiled formula element-wise over arrays of variable values.
+
+    Returns (result, invalid) like basic_calculator_batch.
+    """
+    from expressions import compile_formula
+    compiled = compile_formula(formula)
+    try:
+        arrays = {name: _as_float_array(value) for name, value in variables.items()}
+    except (TypeError, ValueError):
+        raise ValueError("Variable values must be numeric!")
+    result, invalid = compiled.evaluate_batch(**arrays)
+    if history is not None:
+        history.append(
+            f"Batch formula: {formula} ({result.size} values, {int(invalid.sum())} invalid)"
+        )
+    return result, invalid
+
+# Vectorized basic operations. Rows basic_calculator rejects are flagged
+# by operations.invalid_operands; non-finite results are flagged as well.
+_BATCH_OPERATIONS = {
+    '+': lambda np, a, b: np.add(a, b),
+    '-': lambda np, a, b: np.subtract(a, b),
+    '*': lambda np, a, b: np.multiply(a, b),
+    '/': lambda np, a, b: np.divide(a, b),
+    '^': lambda np, a, b: np.power(a, b),
+    '%': lambda np, a, b: np.mod(a, b),
+    '//': lambda np, a, b: np.floor_divide(a, b),
+    '√': lambda np, a, b: np.power(a, 1 / b),
+    'log': lambda np, a, b: np.log(a) / np.log(b),
+    'ln': lambda np, a, b: np.log(a),
+}
+
+BASIC_OPERATIONS = tuple(_BATCH_OPERATIONS)
+
+def basic_calculator_batch(num1, operation, num2, history=None):
+    """Apply basic operations element-wise over arrays of operands.
+
+    operation is one operation for every row or an array of per-row
+    operations. Returns (result, invalid): invalid is a boolean mask of rows
+    basic_calculator would reject (division by zero, bad log inputs, ...) or
+    whose result is not finite, and those rows are NaN in result. Only an
+    unknown operation raises, so one bad row never aborts the batch.
+    """
+    import numpy as np
+    try:
+        a, b = np.broadcast_arrays(_as_float_array(num1), _as_float_array(num2))
+    except (TypeError, ValueError):
+        raise ValueError("Numbers must be numeric values!")
+
+    result = np.empty(a.shape, dtype=np.float64)
+    invalid = np.zeros(a.shape, dtype=bool)
+    if isinstance(operation, str):
+        groups = [(operation, None)]
+    else:
+        operations = np.broadcast_to(np.asarray(operation, dtype=str), a.shape)
+        groups = [(op, operations == op) for op in np.unique(operations)]
+
+    for op, rows in groups:
+        if op not in _BATCH_OPERATIONS:
+            raise ValueError(f"Invalid operation: {op}")
+        compute = _BATCH_OPERATIONS[op]
+        x, y = (a, b) if rows is None else (a[rows], b[rows])
+        with np.errstate(all='ignore'):
+            values = compute(np, x, y)
+            bad = ~np.isfinite(values) | invalid_operands(op, x, y)
+        values = np.where(bad, np.nan, values)
+        if rows is None:
+            result[...] = values
+            invalid[...] = bad
+        else:
+            result[rows] = values
+            invalid[rows] = bad
+
+    if history is not None:
+        label = operation if isinstance(operation, str) else "mixed"
+        history.append(
+            f"Batch calculation: {label} ({result.size} values, {int(invalid.sum())} invalid)"
+        )
+    return result, invalid
+
+@instrumented('unit_converter', label='category', normalize=_category_label)
+def unit_converter(history, category, value, choice, as_result=False):
+    """Convert between various units.
+
+    Returns the conversion as text, or as a ConversionResult holding the
+    numbers (formatted only when printed) if as_result is true.
+    """
     try:
         if not isinstance(value, (int, float)):
             raise ValueError("Value must be numeric!")
         
-        # Create conversion mappings
-        conversions = {
-            'Length': {
-                'Meters to Feet': (METERS_TO_FEET, "meters", "feet"),
-                'Feet to Meters': (FEET_TO_METERS, "feet", "meters"),
-                'Kilometers to Miles': (KILOMETERS_TO_MILES, "kilometers", "miles"),
-                'Miles to Kilometers': (MILES_TO_KILOMETERS, "miles", "kilometers")
-            },
-            'Weight': {
-                'Kilograms to Pounds': (KILOGRAMS_TO_POUNDS, "kilograms", "pounds"),
-                'Pounds to Kilograms': (POUNDS_TO_KILOGRAMS, "pounds", "kilograms"),
-                'Grams to Ounces': (GRAMS_TO_OUNCES, "grams", "ounces"),
-                'Ounces to Grams': (OUNCES_TO_GRAMS, "ounces", "grams")
-            },
-            'Temperature': {
-                'Celsius to Fahrenheit': lambda x: (x * 9/5) + 32,
-                'Fahrenheit to Celsius': lambda x: (x - 32) * 5/9,
-                'Celsius to Kelvin': lambda x: x + 273.15
-            },
-            'Volume': {
-                'Liters to Gallons': (LITERS_TO_GALLONS, "liters", "gallons"),
-                'Gallons to Liters': (GALLONS_TO_LITERS, "gallons", "liters"),
-                'Milliliters to Ounces': (ML_TO_OUNCES, "milliliters", "ounces"),
-                'Ounces to Milliliters': (OUNCES_TO_ML, "ounces", "milliliters")
-            },
-            'Speed': {
-                'km/h to mph': (KMH_TO_MPH, "km/h", "mph"),
-                'mph to km/h': (MPH_TO_KMH, "mph", "km/h"),
-                'm/s to km/h': (MS_TO_KMH, "m/s", "km/h"),
-                'km/h to m/s': (KMH_TO_MS, "km/h", "m/s")
-            }
-        }
-
-        if category not in conversions:
-            raise ValueError(f"Invalid category: {category}")
-        
-        if choice not in conversions[category]:
-            raise ValueError(f"Invalid conversion choice: {choice}")
-
-        # Handle temperature separately due to different formulas
-        if category == 'Temperature':
-            result = conversions[category][choice](value)
-            unit_from, unit_to = choice.split(" to ")
-            conversion = f"{value}°{unit_from[0]} = {result:.4f}°{unit_to[0]}"
-        else:
-            conversion_factor, unit_from, unit_to = conversions[category][choice]
-            result = value * conversion_factor
-            conversion = f"{value} {unit_from} = {result:.4f} {unit_to}"
+        scale, offset, unit_from, unit_to = resolve_conversion(category, choice)
+        result = value * scale + offset
 
-        history.append(conversion)
-        return conversion
+        label = (category, unit_from, unit_to)
+        if as_result:
+            _add_to_history(history, KIND_UNIT, label, (value,), result)
+            return ConversionResult(category, unit_from, unit_to, value, result)
+        text = format_unit_conversion(category, unit_from, unit_to, value, result)
+        _add_to_history(history, KIND_UNIT, label, (value,), result, text)
+        return text
     except ValueError as e:
         raise ValueError(str(e))
 
-def currency_converter(history, amount, from_currency, to_currency):
-    """Convert between supported currencies."""
+def _as_float_array(values):
+    """Convert a sequence, array or raw buffer of values to a float64 array."""
+    import numpy as np
+    if isinstance(values, (bytes, bytearray)):
+        return np.frombuffer(values, dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+def unit_converter_batch(category, values, choice, history=None, out=None):
+    """Convert an array of values between units in one vectorized pass.
+
+    Accepts any sequence, NumPy array or buffer of numbers and returns a
+    float64 NumPy array. History is skipped unless a history list is given,
+    in which case a single summary line is recorded for the whole batch.
+    """
+    import numpy as np
+    scale, offset, _, _ = resolve_conversion(category, choice)
+
+    try:
+        arr = _as_float_array(values)
+    except (TypeError, ValueError):
+        raise ValueError("Values must be numeric!")
+
+    result = np.multiply(arr, scale, out=out)
+    if offset:
+        np.add(result, offset, out=result)
+
+    if history is not None:
+        history.append(f"Batch {category}: {choice} ({arr.size} values)")
+    return result
+
+@instrumented('currency_converter', label=('from_currency', 'to_currency'),
+              normalize=_currency_label)
+def currency_converter(history, amount, from_currency, to_currency, as_result=False):
+    """Convert between supported currencies.
+
+    Returns the conversion as text, or as a ConversionResult if as_result
+    is true.
+    """
     try:
         # Validate amount and currencies
         if not isinstance(amount, (int, float)) or amount < 0:
@@ -186,19 +458,288 @@ def currency_converter(history, amount, from_currency, to_currency):
         
         from_currency = from_currency.upper()
         to_currency = to_currency.upper()
-            
-        if from_currency not in EXCHANGE_RATES:
+        # Read the table once so a concurrent refresh cannot mix two tables
+        rates = EXCHANGE_RATES
+
+        if from_currency not in rates:
             raise ValueError(f"Unsupported currency: {from_currency}")
-        if to_currency not in EXCHANGE_RATES:
+        if to_currency not in rates:
             raise ValueError(f"Unsupported currency: {to_currency}")
 
-        result = amount * (EXCHANGE_RATES[to_currency] / EXCHANGE_RATES[from_currency])
-        conversion_str = f"{amount:.2f} {from_currency} = {result:.2f} {to_currency}"
-        history.append(conversion_str)
-        return conversion_str
+        result = amount * (rates[to_currency] / rates[from_currency])
+        label = (from_currency, to_currency)
+        if as_result:
+            _add_to_history(history, KIND_CURRENCY, label, (amount,), result)
+            return ConversionResult(CURRENCY_CATEGORY, from_currency, to_currency, amount, result)
+        text = format_currency_conversion(from_currency, to_currency, amount, result)
+        _add_to_history(history, KIND_CURRENCY, label, (amount,), result, text)
+        return text
     except ValueError as e:
         raise ValueError(str(e))
 
+def _install_rates(rates):
+    """Swap in a new rate table (called from the rate refresh thread)."""
+    global EXCHANGE_RATES
+    EXCHANGE_RATES = rates
+
+def use_rate_provider(provider, ttl=300.0, wait=False):
+    """Keep EXCHANGE_RATES up to date from a rate_providers provider.
+
+    Rates are fetched every ttl seconds in a background thread and swapped
+    in whole, so currency conversions never wait for a fetch. With
+    wait=True the first fetch happens before returning. Pass None to stop
+    refreshing and keep the current rates. Returns the RateCache.
+    """
+    global _RATE_CACHE
+    from rate_providers import RateCache
+    if _RATE_CACHE is not None:
+        _RATE_CACHE.stop()
+        _RATE_CACHE = None
+    if provider is None:
+        return None
+
+    cache = RateCache(provider, ttl=ttl, initial=EXCHANGE_RATES, on_update=_install_rates)
+    if wait and not cache.refresh():
+        if cache.last_error:
+            raise ValueError(cache.last_error)
+    cache.start()
+    _RATE_CACHE = cache
+    return cache
+
+def rate_metrics():
+    """Return staleness and refresh latency of the rate provider, or None if there is none."""
+    if _RATE_CACHE is None:
+        return None
+    return _RATE_CACHE.metrics()
+
+def cross_rate_table():
+    """Return the cross-rate table, rebuilding it only when EXCHANGE_RATES changes.
+
+    The table holds the currency codes, a code -> index mapping and an N x N
+    matrix where matrix[i, j] converts one unit of codes[i] into codes[j].
+    """
+    global _CROSS_RATES
+    import numpy as np
+    key = tuple(EXCHANGE_RATES.items())
+    if _CROSS_RATES['key'] != key:
+        codes = tuple(code for code, _ in key)
+        rates = np.array([rate for _, rate in key], dtype=np.float64)
+        # Swap in a fully built table so readers never see a partial update
+        _CROSS_RATES = {
+            'key': key,
+            'codes': codes,
+            'index': {code: i for i, code in enumerate(codes)},
+            'matrix': rates[np.newaxis, :] / rates[:, np.newaxis],
+        }
+    return _CROSS_RATES
+
+def currency_converter_batch(amounts, from_currencies, to_currencies, history=None):
+    """Convert arrays of amounts between currencies in one vectorized pass.
+
+    Currencies may be single codes, arrays of codes, or integer indices into
+    cross_rate_table()['codes']. Returns a float64 NumPy array.
+    """
+    try:
+        arr = _as_float_array(amounts)
+    except (TypeError, ValueError):
+        raise ValueError("Amounts must be numeric!")
+    if arr.size and arr.min() < 0:
+        raise ValueError("Amount must be a positive number!")
+
+    table = cross_rate_table()
+    from_idx = currency_indices(from_currencies, table['index'])
+    to_idx = currency_indices(to_currencies, table['index'])
+    result = arr * table['matrix'][from_idx, to_idx]
+
+    if history is not None:
+        history.append(f"Batch currency conversion ({arr.size} amounts)")
+    return result
+
+def currency_converter_historical(amounts, from_currencies, to_currencies, dates, store,
+                                  history=None):
+    """Convert amounts at the exchange rates in effect on each row's date.
+
+    store is a rate_store.RateStore or the path of one. Currencies (codes or
+    indices into store.codes) and dates may be single values or arrays, so
+    millions of ledger rows convert in one vectorized pass. Rows dated before
+    a currency's first quote are NaN.
+    """
+    from rate_store import RateStore
+    try:
+        arr = _as_float_array(amounts)
+    except (TypeError, ValueError):
+        raise ValueError("Amounts must be numeric!")
+    if arr.size and arr.min() < 0:
+        raise ValueError("Amount must be a positive number!")
+
+    if not isinstance(store, RateStore):
+        store = RateStore(store)
+    result = store.convert(arr, from_currencies, to_currencies, dates)
+
+    if history is not None:
+        history.append(f"Historical currency conversion ({arr.size} amounts)")
+    return result
+
+def to_minor_units(amounts, currency):
+    """Convert amounts in major units (e.g. dollars) to int64 minor units (cents).
+
+    Floats are scaled and rounded half to even; amounts that must be exact
+    should be kept in minor units from the start.
+    """
+    import numpy as np
+    try:
+        arr = _as_float_array(amounts)
+    except (TypeError, ValueError):
+        raise ValueError("Amounts must be numeric!")
+    scaled = np.rint(arr * 10.0 ** currency_exponent(currency))
+    if not np.all(np.isfinite(scaled)):
+        raise ValueError("Amounts must be finite numbers!")
+    if scaled.size and np.abs(scaled).max() >= 2.0 ** 63:
+        raise ValueError("Amount too large for minor units!")
+    return scaled.astype(np.int64)
+
+def from_minor_units(minor, currency):
+    """Convert int64 minor units back to float major units."""
+    import numpy as np
+    return np.asarray(minor, dtype=np.int64) / 10.0 ** currency_exponent(currency)
+
+def format_minor_units(minor, currency):
+    """Render an integer amount of minor units exactly, e.g. 123456 USD -> '1234.56 USD'."""
+    code = currency.upper()
+    exponent = currency_exponent(code)
+    minor = int(minor)
+    if exponent == 0:
+        return f"{minor} {code}"
+    whole, fraction = divmod(abs(minor), 10 ** exponent)
+    sign = "-" if minor < 0 else ""
+    return f"{sign}{whole}.{fraction:0{exponent}d} {code}"
+
+def minor_rate_table():
+    """Return exact integer cross rates between minor units.
+
+    num[i, j] / den[i, j] (in lowest terms) converts minor units of
+    codes[i] into minor units of codes[j], using
+    the rates rounded to RATE_DECIMALS places. Rebuilt only when the rates
+    change.
+    """
+    global _MINOR_RATES
+    import numpy as np
+    from decimal import Decimal
+    table = cross_rate_table()
+    if _MINOR_RATES['key'] != table['key']:
+        codes = table['codes']
+        # Decimal(str()) reads each rate as written, so 0.85 is exactly 850000;
+        # float() first, since str(np.float64) is fine but repr() is not
+        scaled = [int(round(Decimal(str(float(rate))) * 10 ** RATE_DECIMALS))
+                  for _, rate in table['key']]
+        if min(scaled) <= 0:
+            raise ValueError(f"Exchange rates below 1e-{RATE_DECIMALS} are not supported in minor units!")
+        exponents = [currency_exponent(code) for code in codes]
+        size = len(codes)
+        num = np.empty((size, size), dtype=np.int64)
+        den = np.empty((size, size), dtype=np.int64)
+        for i in range(size):
+            for j in range(size):
+                n = scaled[j] * 10 ** max(exponents[j] - exponents[i], 0)
+                d = scaled[i] * 10 ** max(exponents[i] - exponents[j], 0)
+                g = math.gcd(n, d)
+                n, d = n // g, d // g
+                # The remainder times num must fit in int64; see _divide_rounded
+                if (d - 1) * n >= 2 ** 63:
+                    raise ValueError(f"Exchange rate {codes[i]}->{codes[j]} is too extreme for minor units!")
+                num[i, j], den[i, j] = n, d
+        _MINOR_RATES = {'key': table['key'], 'codes': codes, 'index': table['index'],
+                        'num': num, 'den': den}
+    return _MINOR_RATES
+
+def _divide_rounded(amounts, num, den, rounding):
+    """Exactly compute amounts * num / den in int64, rounded as requested.
+
+    When amounts * num cannot overflow it is divided directly. Otherwise
+    amounts is split as q * den + r with 0 <= r < den, so the product is
+    q * num + r * num / den and only the small r * num needs dividing.
+    Raises ValueError only when the rounded result does not fit in int64.
+    """
+    import numpy as np
+    if np.ndim(num) == 0 and num == den:
+        # Identity rate for a single pair: nothing to convert or round
+        return amounts.copy()
+    largest = np.iinfo(np.int64).max
+    # Compare against the bounds rather than negating: -INT64_MIN overflows
+    limit = largest // np.max(num)
+    split = not (amounts.size and amounts.max() <= limit and amounts.min() >= -limit)
+    if not split:
+        if np.ndim(den) == 0 and den == 1:
+            # Whole-number rate for a single pair: nothing to round
+            return amounts * num
+        base, remainder = np.divmod(amounts * num, den)
+        negative = base < 0
+    else:
+        q, r = np.divmod(amounts, den)
+        extra, remainder = np.divmod(r * num, den)
+        # base = q * num + extra may wrap around here; it is checked below,
+        # and its sign is that of q because 0 <= extra < num
+        base = q * num + extra
+        negative = q < 0
+    # base is the floor of the exact result and remainder / den its fraction;
+    # comparing remainder with den - remainder avoids doubling it
+    rest = den - remainder
+    if rounding == 'half_even':
+        # Round up past the half, or at it when base is odd
+        up = remainder + (base & 1) > rest
+    elif rounding == 'half_up':
+        # Halves round away from zero, which is up only for base >= 0
+        up = remainder - negative >= rest
+    else:
+        # Toward zero: negative results with a fraction move up
+        up = (remainder > 0) & negative
+    overflow = up & (base == largest)
+    if split:
+        # base = q * num + extra fits in int64 exactly when
+        # ceil((min - extra) / num) <= q <= floor((max - extra) / num), with
+        # min - extra = -(max + extra + 1) split up so that nothing overflows
+        high = (largest - extra) // num
+        low = -(largest // num + (largest % num + extra + 1) // num)
+        below = q < low
+        # The one base below INT64_MIN that fits once rounded up is
+        # INT64_MIN - 1, which has wrapped around to INT64_MAX
+        rescued = below & (q == low - 1) & overflow
+        overflow = (q > high) | (below & ~rescued) | (overflow & ~below)
+    if np.any(overflow):
+        raise ValueError("Amount too large for minor-unit conversion!")
+    return base + up
+
+def currency_converter_minor(amounts, from_currencies, to_currencies, rounding='half_even',
+                             history=None):
+    """Convert int64 amounts in minor units (cents, pence...) exactly.
+
+    Uses integer arithmetic only, so results and their totals are exact and
+    reproducible: each row is rounded once with the given rounding mode
+    ('half_even', 'half_up' or 'down', as in the decimal module), at rates
+    taken to RATE_DECIMALS places. Negative amounts (refunds) are allowed.
+    Currencies may be codes, arrays of codes
+    or indices into minor_rate_table()['codes']. Returns an int64 array.
+    """
+    import numpy as np
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Invalid rounding mode: {rounding}")
+    arr = np.asarray(amounts)
+    if arr.dtype.kind not in 'iu' and arr.size:
+        raise ValueError("Minor-unit amounts must be integers!")
+    if arr.dtype.kind == 'u' and arr.size and arr.max() >= 2 ** 63:
+        raise ValueError("Amount too large for minor-unit conversion!")
+    arr = arr.astype(np.int64, copy=False)
+
+    table = minor_rate_table()
+    from_idx = currency_indices(from_currencies, table['index'])
+    to_idx = currency_indices(to_currencies, table['index'])
+    result = _divide_rounded(arr, table['num'][from_idx, to_idx], table['den'][from_idx, to_idx],
+                             rounding)
+
+    if history is not None:
+        history.append(f"Minor-unit currency conversion ({arr.size} amounts, {rounding})")
+    return result
+
 def view_history(history):
     """Display the calculation and conversion history."""
     if not history:
@@ -210,13 +751,16 @@ def clear_history(history):
     history.clear()
     return "History cleared."
 
-def export_history(history):
+def export_history(history, filename="history.txt"):
     """Export the history to a file."""
     try:
-        with open("history.txt", "w") as file:
-            for entry in history:
-                file.write(entry + "\n")
-        return "History exported to 'history.txt'."
+        if isinstance(history, History):
+            history.export(filename)
+        else:
+            with open(filename, "w") as file:
+                for entry in history:
+                    file.write(entry + "\n")
+        return f"History exported to '{filename}'."
     except IOError:
         raise ValueError("Error writing to file!")
 
@@ -250,9 +794,16 @@ def confirm_exit():
     except:
         return False
 
+@instrumented('scientific_calculation')
 def scientific_calculation(expr_str):
-    """Perform scientific calculations."""
+    """Perform scientific calculations, reusing cached results for known expressions."""
+    from sympy import symbols, sympify, diff, integrate, simplify
     try:
+        key = _SCIENTIFIC_CACHE.canonical_key(expr_str)
+        cached = _SCIENTIFIC_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
         x = symbols('x')
         expr = sympify(expr_str)
         
@@ -260,16 +811,66 @@ def scientific_calculation(expr_str):
         integral = integrate(expr, x)
         simplified = simplify(expr)
         
-        return {
+        result = {
             'derivative': str(derivative),
             'integral': str(integral),
             'simplified': str(simplified)
         }
+        _SCIENTIFIC_CACHE.put(key, result)
+        return dict(result)
+    except Exception as e:
+        raise ValueError(f"Invalid expression: {str(e)}")
+
+def scientific_evaluate(expr_str, x_values=None, which='function', x_range=None,
+                        chunk_size=DEFAULT_EVAL_CHUNK, summarize=False):
+    """Evaluate an expression in x, its derivative or its integral numerically.
+
+    The expression is compiled once into a vectorized NumPy function and
+    evaluated in chunks over x_values or over x_range=(start, stop, count)
+    evenly spaced points. With summarize=True only summary statistics are
+    returned, so a range of any length is evaluated in bounded memory.
+    """
+    import numpy as np
+    if (x_values is None) == (x_range is None):
+        raise ValueError("Specify either x values or an x range!")
+    try:
+        compiled = compile_expression(expr_str)
+        if not summarize:
+            return compiled.evaluate(x_values, x_range, which, chunk_size)
+
+        from streaming_stats import StreamingStats
+        stats = StreamingStats()
+        non_finite = 0
+        preview = []
+        for x_chunk, y_chunk in compiled.chunks(x_values, x_range, which, chunk_size):
+            finite = np.isfinite(y_chunk)
+            non_finite += int(finite.size - np.count_nonzero(finite))
+            stats.update(y_chunk[finite])
+            if not preview:
+                preview = list(zip(x_chunk[:10].tolist(), y_chunk[:10].tolist()))
+        result = stats.result()
+        result['non_finite'] = non_finite
+        result['preview'] = preview
+        return result
     except Exception as e:
         raise ValueError(f"Invalid expression: {str(e)}")
 
+def configure_scientific_cache(maxsize=256, path=None):
+    """Replace the scientific calculation cache, optionally backed by a file."""
+    global _SCIENTIFIC_CACHE
+    _SCIENTIFIC_CACHE = SymbolicCache(maxsize=maxsize, path=path)
+
+def scientific_cache_info():
+    """Return hit and miss counters for the scientific calculation cache."""
+    return _SCIENTIFIC_CACHE.info()
+
+@instrumented('statistical_analysis')
 def statistical_analysis(numbers):
     """Perform statistical analysis."""
+    import numpy as np
+    # Iterators and generators are consumed in a single streaming pass
+    if not hasattr(numbers, '__len__') and hasattr(numbers, '__iter__'):
+        return streaming_statistical_analysis(numbers)
     try:
         arr = np.array(numbers)
         return {
@@ -283,14 +884,76 @@ def statistical_analysis(numbers):
     except Exception as e:
         raise ValueError(f"Invalid data: {str(e)}")
 
-def matrix_operations(matrix_a, matrix_b):
-    """Perform matrix operations."""
+def streaming_statistical_analysis(data, chunk_size=65536):
+    """Perform statistical analysis in one pass over numbers or array chunks.
+
+    Uses constant memory, so data may be larger than RAM; the median is
+    exact for small inputs and approximate for large ones.
+    """
+    from streaming_stats import StreamingStats
+    try:
+        return StreamingStats().consume(data, chunk_size=chunk_size).result()
+    except Exception as e:
+        raise ValueError(f"Invalid data: {str(e)}")
+
+def parallel_statistical_analysis(numbers=None, path=None, processes=None):
+    """Perform statistical analysis on all CPU cores.
+
+    Takes a large array, or the path of a raw binary float64 file, and
+    splits it into shards that worker processes read through shared memory
+    or a memory map.
+    """
+    from streaming_stats import parallel_stats
     try:
-        return {
-            'addition': matrix_a + matrix_b,
-            'multiplication': matrix_a @ matrix_b,
-            'det_a': np.linalg.det(matrix_a),
-            'inverse_a': np.linalg.inv(matrix_a)
-        }
+        return parallel_stats(numbers, path=path, processes=processes).result()
+    except Exception as e:
+        raise ValueError(f"Invalid data: {str(e)}")
+
+def matrix_engine(matrix_a, matrix_b=None):
+    """Return a lazy MatrixEngine, reusing A's factorization when A is unchanged.
+
+    A is compared by a digest of its contents, so an array changed in place
+    since the previous call gets a fresh factorization. The cached
+    factorization works on its own copy of A.
+    """
+    global _LAST_FACTORIZATION
+    from matrix_engine import MatrixEngine, fingerprint
+    key = fingerprint(matrix_a)
+    factorization = None
+    if _LAST_FACTORIZATION is not None and _LAST_FACTORIZATION[0] == key:
+        factorization = _LAST_FACTORIZATION[1]
+    engine = MatrixEngine(matrix_a, matrix_b, factorization)
+    _LAST_FACTORIZATION = (key, engine.factorization)
+    return engine
+
+def clear_matrix_cache():
+    """Drop the cached matrix A and its factorization, determinant and inverse."""
+    global _LAST_FACTORIZATION
+    _LAST_FACTORIZATION = None
+
+@instrumented('matrix_operations')
+def matrix_operations(matrix_a, matrix_b, operations=None, summarize=False):
+    """Perform the requested matrix operations (all of them by default).
+
+    Matrices may be dense arrays, scipy.sparse matrices or file paths (see
+    parsing.load_matrix). With summarize=True each result is replaced by its
+    shape, non-zero count and norms, so large results are not returned whole.
+    """
+    from parsing import load_matrix
+    if operations is None:
+        operations = ('addition', 'multiplication', 'det_a', 'inverse_a')
+    try:
+        if isinstance(matrix_a, str):
+            matrix_a = load_matrix(matrix_a)
+        if isinstance(matrix_b, str):
+            matrix_b = load_matrix(matrix_b)
+        results = matrix_engine(matrix_a, matrix_b).compute(operations)
+        if summarize:
+            from matrix_engine import summarize as summarize_matrix
+            results = {
+                name: value if name == 'det_a' else summarize_matrix(value)
+                for name, value in results.items()
+            }
+        return results
     except Exception as e:
         raise ValueError(f"Invalid matrices: {str(e)}")
\ No newline at end of file
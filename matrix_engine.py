@@ -0,0 +1,266 @@
+"""On-demand matrix operations that share a cached LU factorization.
+
+Each operation is computed only when asked for. The LU factorization of A
+is computed at most once and reused by det, solve and inverse, and solve
+is available as a faster, more stable alternative to multiplying by an
+explicit inverse.
+
+Sparse matrices stay in scipy.sparse form throughout: sums and products use
+sparse arithmetic and A is factorized with SuperLU, so nothing is densified.
+Dense arrays may be memory-mapped .npy files, which are read in place.
+"""
+import hashlib
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+
+OPERATIONS = ('addition', 'multiplication', 'det_a', 'inverse_a', 'solve')
+
+# Results with at most this many elements are included in summaries as values
+PREVIEW_SIZE = 100
+
+# Columns solved at a time when the right-hand side is sparse
+_SPARSE_SOLVE_BLOCK = 256
+
+def _as_matrix(matrix):
+    """Return matrix as a float sparse matrix or ndarray, avoiding copies."""
+    if sp.issparse(matrix):
+        return matrix if matrix.dtype.kind in 'fc' else matrix.astype(np.float64)
+    matrix = np.asarray(matrix)
+    return matrix if matrix.dtype.kind in 'fc' else matrix.astype(np.float64)
+
+def fingerprint(matrix):
+    """Digest of a matrix's type, shape and contents, for spotting in-place changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    if sp.issparse(matrix):
+        matrix = matrix.tocsr()
+        digest.update(repr(('sparse', matrix.shape, matrix.dtype.str)).encode())
+        for part in (matrix.data, matrix.indices, matrix.indptr):
+            digest.update(np.ascontiguousarray(part).data)
+    else:
+        matrix = np.asarray(matrix)
+        digest.update(repr(('dense', matrix.shape, matrix.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(matrix).data)
+    return digest.digest()
+
+def _plain(result):
+    """Turn np.matrix results of mixed sparse/dense arithmetic into ndarrays."""
+    return np.asarray(result) if isinstance(result, np.matrix) else result
+
+def _permutation_sign(perm):
+    """Sign (+1 or -1) of a permutation given as an index array."""
+    perm = np.asarray(perm)
+    seen = np.zeros(len(perm), dtype=bool)
+    transpositions = 0
+    for start in range(len(perm)):
+        length = 0
+        i = start
+        while not seen[i]:
+            seen[i] = True
+            i = perm[i]
+            length += 1
+        if length:
+            transpositions += length - 1
+    return -1.0 if transpositions % 2 else 1.0
+
+def summarize(matrix):
+    """Describe a matrix by shape, non-zeros and norms instead of its values.
+
+    Small results also carry their values under 'values' for display.
+    """
+    if sp.issparse(matrix):
+        from scipy.sparse.linalg import norm
+        summary = {
+            'shape': matrix.shape,
+            'nnz': int(matrix.nnz),
+            'sparse': True,
+            'fro_norm': float(norm(matrix)),
+            'one_norm': float(norm(matrix, 1)),
+            'inf_norm': float(norm(matrix, np.inf)),
+        }
+    else:
+        matrix = np.asarray(matrix)
+        two_d = matrix.ndim == 2
+        summary = {
+            'shape': matrix.shape,
+            'nnz': int(np.count_nonzero(matrix)),
+            'sparse': False,
+            'fro_norm': float(np.linalg.norm(matrix)),
+            'one_norm': float(np.linalg.norm(matrix, 1)) if two_d else None,
+            'inf_norm': float(np.linalg.norm(matrix, np.inf)) if two_d else None,
+        }
+    size = int(np.prod(matrix.shape))
+    summary['density'] = summary['nnz'] / size if size else 0.0
+    if size <= PREVIEW_SIZE:
+        summary['values'] = matrix.toarray() if sp.issparse(matrix) else np.array(matrix)
+    return summary
+
+def _read_only(matrix):
+    """Return a result that callers cannot change in place.
+
+    Dense arrays become read-only views; sparse matrices cannot be locked,
+    so a copy is returned instead.
+    """
+    if sp.issparse(matrix):
+        return matrix.copy()
+    view = matrix.view()
+    view.setflags(write=False)
+    return view
+
+class Factorization:
+    """A private, read-only copy of A with its LU factors, determinant and inverse.
+
+    Built once per distinct A and shared by every MatrixEngine over a matrix
+    with the same contents, so changes to the caller's array never reach it.
+    """
+
+    def __init__(self, matrix_a):
+        matrix_a = _as_matrix(matrix_a)
+        if sp.issparse(matrix_a):
+            self.a = matrix_a.copy()
+        else:
+            self.a = np.array(matrix_a)
+            self.a.setflags(write=False)
+        self._lu = None
+        self._singular = False
+        self._results = {}
+
+    @property
+    def sparse(self):
+        return sp.issparse(self.a)
+
+    def lu(self):
+        """Return A's LU factorization, computing it on first use.
+
+        Dense A gives scipy.linalg.lu_factor's (lu, piv); sparse A gives a
+        SuperLU object, or None if it is exactly singular.
+        """
+        if self._lu is None and not self._singular:
+            if self.a.ndim != 2 or self.a.shape[0] != self.a.shape[1]:
+                raise ValueError("Matrix A must be square!")
+            if self.sparse:
+                from scipy.sparse.linalg import splu
+                try:
+                    self._lu = splu(sp.csc_matrix(self.a))
+                except RuntimeError:
+                    self._singular = True
+            else:
+                from scipy.linalg import lu_factor
+                with warnings.catch_warnings():
+                    # Singular matrices are reported by the operations that need an inverse
+                    warnings.simplefilter("ignore")
+                    self._lu = lu_factor(self.a, check_finite=False)
+        return self._lu
+
+    def det(self):
+        """Determinant of A from the diagonal of its LU factors."""
+        @np.errstate(over='ignore', under='ignore')
+        def compute():
+            factors = self.lu()
+            if self.sparse:
+                if factors is None:
+                    return 0.0
+                sign = _permutation_sign(factors.perm_r) * _permutation_sign(factors.perm_c)
+                return float(np.prod(factors.U.diagonal()) * sign)
+            lu, piv = factors
+            swaps = np.count_nonzero(piv != np.arange(len(piv)))
+            return float(np.prod(np.diag(lu)) * (-1) ** swaps)
+        if 'det' not in self._results:
+            self._results['det'] = compute()
+        return self._results['det']
+
+    def inverse(self):
+        """Inverse of A, solved from the LU factors (sparse for sparse A); read-only."""
+        if 'inverse' not in self._results:
+            if self.sparse:
+                identity = sp.identity(self.a.shape[0], format='csc')
+            else:
+                identity = np.eye(self.a.shape[0])
+            self._results['inverse'] = self.solve(identity)
+        return _read_only(self._results['inverse'])
+
+    def solve(self, rhs):
+        """Solve A x = rhs with the LU factors."""
+        factors = self.lu()
+        if self.sparse:
+            if factors is None:
+                raise ValueError("Singular matrix")
+            if not sp.issparse(rhs):
+                return factors.solve(np.asarray(rhs, dtype=np.float64))
+            # Solve a block of columns at a time so only a narrow dense slice exists
+            rhs = sp.csc_matrix(rhs)
+            blocks = []
+            for start in range(0, rhs.shape[1], _SPARSE_SOLVE_BLOCK):
+                block = rhs[:, start:start + _SPARSE_SOLVE_BLOCK].toarray()
+                blocks.append(sp.csc_matrix(factors.solve(block)))
+            return sp.hstack(blocks, format='csc')
+
+        from scipy.linalg import lu_solve
+        lu, piv = factors
+        if np.any(np.diag(lu) == 0):
+            raise ValueError("Singular matrix")
+        if sp.issparse(rhs):
+            rhs = rhs.toarray()
+        return lu_solve((lu, piv), rhs, check_finite=False)
+
+class MatrixEngine:
+    """Lazily evaluated operations on matrix A and an optional matrix B.
+
+    Sums and products use the matrices as passed; the determinant, inverse
+    and solves come from a Factorization of A, which may be shared with
+    other engines over the same A.
+    """
+
+    def __init__(self, matrix_a, matrix_b=None, factorization=None):
+        self.a = _as_matrix(matrix_a)
+        self.b = None if matrix_b is None else _as_matrix(matrix_b)
+        self.factorization = Factorization(self.a) if factorization is None else factorization
+        self._results = {}
+
+    @property
+    def sparse(self):
+        return sp.issparse(self.a)
+
+    def lu(self):
+        """Return A's LU factorization (see Factorization.lu)."""
+        return self.factorization.lu()
+
+    def addition(self):
+        return self._cached('addition', lambda: _plain(self.a + self._require_b()))
+
+    def multiplication(self):
+        return self._cached('multiplication', lambda: _plain(self.a @ self._require_b()))
+
+    def det_a(self):
+        """Determinant of A from the diagonal of its LU factors."""
+        return self.factorization.det()
+
+    def inverse_a(self):
+        """Inverse of A from the cached LU factors, as a read-only array."""
+        return self.factorization.inverse()
+
+    def solve(self, rhs=None):
+        """Solve A x = rhs (B by default) without forming the inverse."""
+        if rhs is None:
+            return self._cached('solve', lambda: self.factorization.solve(self._require_b()))
+        return self.factorization.solve(_as_matrix(rhs))
+
+    def compute(self, operations=OPERATIONS):
+        """Return a dict with the requested operations only."""
+        results = {}
+        for name in operations:
+            if name not in OPERATIONS:
+                raise ValueError(f"Invalid matrix operation: {name}")
+            results[name] = getattr(self, name)()
+        return results
+
+    def _cached(self, name, compute):
+        if name not in self._results:
+            self._results[name] = compute()
+        return self._results[name]
+
+    def _require_b(self):
+        if self.b is None:
+            raise ValueError("Matrix B is required for this operation!")
+        return self.b
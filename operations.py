@@ -0,0 +1,37 @@
+"""Input checks shared by the basic operations.
+
+Each operation maps to (message, predicate) pairs in the order they are
+checked. Predicates take the two operands and work element-wise on NumPy
+arrays as well as on plain numbers, so basic_calculator, its batch version
+and formulas reject the same inputs with the same messages.
+"""
+
+CHECKS = {
+    '/': (("Error: Division by zero!", lambda a, b: b == 0),),
+    '%': (("Error: Modulo by zero!", lambda a, b: b == 0),),
+    '//': (("Error: Division by zero!", lambda a, b: b == 0),),
+    # a is the number, b is the root
+    '√': (
+        ("Error: Root cannot be zero!", lambda a, b: b == 0),
+        ("Error: Even root of negative number!", lambda a, b: (a < 0) & (b % 2 == 0)),
+    ),
+    # b is the base
+    'log': (
+        ("Error: Logarithm inputs must be positive!", lambda a, b: (a <= 0) | (b <= 0)),
+        ("Error: Log base cannot be 1!", lambda a, b: b == 1),
+    ),
+    'ln': (("Error: Natural log input must be positive!", lambda a, b: a <= 0),),
+}
+
+def check_operands(operation, a, b):
+    """Raise ValueError with the operation's message if a and b are invalid for it."""
+    for message, predicate in CHECKS.get(operation, ()):
+        if predicate(a, b):
+            raise ValueError(message)
+
+def invalid_operands(operation, a, b):
+    """Element-wise mask of the operands check_operands() would reject (False if none)."""
+    mask = False
+    for _, predicate in CHECKS.get(operation, ()):
+        mask = mask | predicate(a, b)
+    return mask
@@ -0,0 +1,108 @@
+"""Bulk parsing of pasted or file-based numeric input into NumPy arrays.
+
+Numbers may be separated by commas, semicolons or any whitespace, so data
+pasted from spreadsheets, CSV files or the clipboard can be used as is.
+Conversion happens in a single NumPy call; only when it fails is the text
+scanned again to report the exact position of the first malformed token.
+"""
+import os
+import re
+
+import numpy as np
+
+# Separators between values; semicolons and newlines also end matrix rows
+_VALUE_SEPARATORS = str.maketrans(",;", "  ")
+_TOKEN = re.compile(r"[^\s,;]+")
+_ROW_SEPARATOR = re.compile(r";|\r?\n")
+
+class ParseError(ValueError):
+    """Raised for malformed numeric input; offset is the index of the bad token."""
+
+    def __init__(self, message, offset=None, token=None):
+        super().__init__(message)
+        self.offset = offset
+        self.token = token
+
+def _locate_error(text, base_offset=0):
+    """Find the first token in text that is not a valid number."""
+    for match in _TOKEN.finditer(text):
+        try:
+            float(match.group())
+        except ValueError:
+            offset = base_offset + match.start()
+            return ParseError(
+                f"Invalid number '{match.group()}' at offset {offset}",
+                offset=offset, token=match.group()
+            )
+    return ParseError("Invalid numeric input")
+
+def parse_numbers(text):
+    """Parse delimited text into a 1-D float64 array in one pass."""
+    tokens = text.translate(_VALUE_SEPARATORS).split()
+    if not tokens:
+        raise ParseError("No numbers found", offset=0)
+    try:
+        return np.array(tokens, dtype=np.float64)
+    except ValueError:
+        raise _locate_error(text) from None
+
+def parse_matrix(text):
+    """Parse a matrix with rows separated by ';' or newlines into a 2-D array."""
+    rows = []
+    offsets = []
+    position = 0
+    for match in _ROW_SEPARATOR.finditer(text + "\n"):
+        row = text[position:match.start()]
+        if row.strip():
+            rows.append(row)
+            offsets.append(position)
+        position = match.end()
+    if not rows:
+        raise ParseError("No numbers found", offset=0)
+
+    counts = [len(row.translate(_VALUE_SEPARATORS).split()) for row in rows]
+    for i, count in enumerate(counts):
+        if count != counts[0]:
+            raise ParseError(
+                f"Row {i + 1} has {count} values, expected {counts[0]} (offset {offsets[i]})",
+                offset=offsets[i]
+            )
+
+    tokens = " ".join(rows).translate(_VALUE_SEPARATORS).split()
+    try:
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        for row, offset in zip(rows, offsets):
+            error = _locate_error(row, offset)
+            if error.offset is not None:
+                raise error from None
+        raise ParseError("Invalid numeric input") from None
+    return values.reshape(len(rows), counts[0])
+
+def load_matrix(path):
+    """Load a matrix from .npy (memory-mapped), sparse .npz/.mtx, or delimited text.
+
+    Sparse files are returned in scipy.sparse CSR form and are never densified.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        matrix = np.load(path, mmap_mode="r")
+        if matrix.ndim != 2:
+            raise ParseError(f"Expected a 2-D matrix in {path}, got {matrix.ndim}-D")
+        return matrix
+    if extension == ".npz":
+        import scipy.sparse
+        return scipy.sparse.load_npz(path).tocsr()
+    if extension == ".mtx":
+        import scipy.io
+        import scipy.sparse
+        return scipy.sparse.csr_matrix(scipy.io.mmread(path))
+    with open(path, "r") as file:
+        return parse_matrix(file.read())
+
+def parse_file(path):
+    """Load numbers from a .npy file (memory-mapped) or a delimited text file."""
+    if os.path.splitext(path)[1].lower() == ".npy":
+        return np.load(path, mmap_mode="r")
+    with open(path, "r") as file:
+        return parse_numbers(file.read())
@@ -0,0 +1,204 @@
+"""Exchange-rate providers and a cache that refreshes them in the background.
+
+A provider is any object with a fetch() method returning a mapping of
+currency code -> units of that currency per one US dollar, the convention
+used by main.EXCHANGE_RATES. StaticRateProvider serves rates held in
+memory and FileRateProvider reads them from a JSON file; a provider backed
+by a web service only needs to implement fetch().
+
+RateCache calls the provider from a daemon thread every ttl seconds and
+publishes each new table by swapping in a complete dict, so readers always
+see either the old rates or the new ones and never wait for a fetch. A
+failed fetch keeps the last good rates. Staleness, refresh latency and
+failure counts are reported by metrics().
+"""
+import json
+import threading
+import time
+
+class RateProvider:
+    """Base class for exchange-rate sources."""
+
+    name = "provider"
+
+    def fetch(self):
+        """Return a {code: rate per USD} mapping."""
+        raise NotImplementedError
+
+class StaticRateProvider(RateProvider):
+    """Serve rates held in memory; set_rates() changes them, e.g. in tests."""
+
+    name = "static"
+
+    def __init__(self, rates):
+        self._rates = dict(rates)
+
+    def set_rates(self, rates):
+        self._rates = dict(rates)
+
+    def fetch(self):
+        return dict(self._rates)
+
+class FileRateProvider(RateProvider):
+    """Read rates from a JSON object such as {"USD": 1.0, "EUR": 0.85}."""
+
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        try:
+            with open(self.path) as file:
+                rates = json.load(file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Invalid rates file {self.path}: {str(e)}")
+        if not isinstance(rates, dict):
+            raise ValueError(f"Invalid rates file {self.path}: expected a JSON object")
+        return rates
+
+def validate_rates(rates):
+    """Return rates as a {CODE: float} dict, rejecting empty or non-positive tables."""
+    table = {}
+    for code, rate in rates.items():
+        try:
+            value = float(rate)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid data: rate '{rate}' for {code}")
+        if not value > 0 or value == float('inf'):
+            raise ValueError(f"Invalid data: non-positive rate for {code}")
+        table[str(code).upper()] = value
+    if not table:
+        raise ValueError("Invalid data: no exchange rates")
+    return table
+
+class RateCache:
+    """Keep the latest rates from a provider, refreshed every ttl seconds.
+
+    on_update, if given, is called with the new table from the refresh
+    thread whenever the rates actually change. retry_interval is the
+    shortest time between fetches, so a failing provider is not hammered
+    by readers that keep finding the rates stale.
+    """
+
+    def __init__(self, provider, ttl=300.0, initial=None, on_update=None, retry_interval=1.0):
+        if ttl <= 0:
+            raise ValueError("TTL must be a positive number!")
+        self.provider = provider
+        self.ttl = ttl
+        self.retry_interval = min(retry_interval, ttl)
+        self.on_update = on_update
+        self.rates = dict(initial) if initial is not None else None
+        self.version = 0
+        self._fetched_at = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        # Refresh statistics, read by metrics()
+        self.refreshes = 0
+        self.failures = 0
+        self.changes = 0
+        self.last_error = None
+        self.last_refresh_ms = None
+        self._total_refresh_ms = 0.0
+        self.max_refresh_ms = 0.0
+
+    @property
+    def age(self):
+        """Seconds since the last successful refresh (None if there has been none)."""
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    @property
+    def stale(self):
+        """True when the rates are older than ttl or were never fetched."""
+        age = self.age
+        return age is None or age > self.ttl
+
+    def get(self):
+        """Return the current rate table without blocking.
+
+        When it is stale, the refresh thread is woken to fetch new rates and
+        the current table is returned meanwhile.
+        """
+        if self.stale and self._thread is not None:
+            self._wake.set()
+        return self.rates
+
+    def refresh(self):
+        """Fetch from the provider now; returns True if the rates changed."""
+        with self._refresh_lock:
+            start = time.perf_counter()
+            try:
+                rates = validate_rates(self.provider.fetch())
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                return False
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.refreshes += 1
+                self.last_refresh_ms = elapsed_ms
+                self._total_refresh_ms += elapsed_ms
+                self.max_refresh_ms = max(self.max_refresh_ms, elapsed_ms)
+
+            self._fetched_at = time.monotonic()
+            self.last_error = None
+            if rates == self.rates:
+                return False
+            # Publish a fully built table in one assignment
+            self.rates = rates
+            self.version += 1
+            self.changes += 1
+        if self.on_update is not None:
+            self.on_update(rates)
+        return True
+
+    def start(self):
+        """Start the refresh thread, fetching at once unless the rates are fresh."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rate-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the refresh thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.stale:
+                self.refresh()
+            if self._stop.wait(self.retry_interval):
+                break
+            # Sleep until the rates expire, or until get() finds them stale
+            self._wake.clear()
+            self._wake.wait(self.ttl - self.retry_interval)
+
+    def metrics(self):
+        """Return staleness and refresh statistics as a dict."""
+        age = self.age
+        completed = self.refreshes
+        return {
+            'provider': getattr(self.provider, 'name', type(self.provider).__name__),
+            'ttl_seconds': self.ttl,
+            'age_seconds': age,
+            'stale': self.stale,
+            'version': self.version,
+            'currencies': len(self.rates) if self.rates else 0,
+            'refreshes': completed,
+            'failures': self.failures,
+            'changes': self.changes,
+            'last_error': self.last_error,
+            'last_refresh_ms': self.last_refresh_ms,
+            'mean_refresh_ms': self._total_refresh_ms / completed if completed else None,
+            'max_refresh_ms': self.max_refresh_ms if completed else None,
+            'running': self._thread is not None and self._thread.is_alive(),
+        }
@@ -0,0 +1,142 @@
+"""Time-indexed exchange rates for converting amounts as of a date.
+
+A rate store is a directory holding a sorted day index and one column of
+rates per currency, saved as .npy files and memory-mapped on open, so a
+store with decades of daily rates opens instantly and only the pages that
+are read are loaded. Rates use the same convention as main.EXCHANGE_RATES:
+units of the currency per one US dollar.
+
+Lookups are "as of": the rate for a date is the latest one quoted on or
+before it, found by binary search. Gaps are forward-filled when the store
+is written, so each lookup is a single index into each column.
+
+Layout:
+    dates.npy       int64 days since 1970-01-01, ascending
+    rates.npy       float64 (currencies x dates), one contiguous row per currency
+    currencies.json currency codes in row order
+"""
+import csv
+import json
+import os
+
+import numpy as np
+
+from currencies import currency_indices
+
+def _as_days(dates):
+    """Convert dates (datetime64, 'YYYY-MM-DD' strings or day numbers) to int64 days."""
+    arr = np.asarray(dates)
+    if arr.dtype.kind in 'iu':
+        return arr.astype(np.int64)
+    return arr.astype('datetime64[D]').astype(np.int64)
+
+class RateStore:
+    """Memory-mapped, columnar store of daily exchange rates."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.days = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+            self.rates = np.load(os.path.join(path, "rates.npy"), mmap_mode="r")
+            with open(os.path.join(path, "currencies.json")) as file:
+                self.codes = tuple(json.load(file))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Invalid rate store {path}: {str(e)}")
+        self.index = {code: i for i, code in enumerate(self.codes)}
+
+    @classmethod
+    def create(cls, path, dates, rates):
+        """Write a store from dates and a {code: rates per date} mapping and open it.
+
+        Dates need not be sorted. NaN marks a missing quote and is filled
+        with the currency's previous rate.
+        """
+        days = _as_days(dates)
+        order = np.argsort(days, kind='stable')
+        days = days[order]
+        if np.any(np.diff(days) == 0):
+            raise ValueError("Invalid data: duplicate dates in rate store")
+
+        codes = sorted(code.upper() for code in rates)
+        matrix = np.empty((len(codes), len(days)), dtype=np.float64)
+        for row, code in zip(matrix, sorted(rates, key=str.upper)):
+            values = np.asarray(rates[code], dtype=np.float64)[order]
+            if np.any(values <= 0):
+                raise ValueError(f"Invalid data: non-positive rate for {code}")
+            # Forward-fill gaps with the previous quote
+            quoted = ~np.isnan(values)
+            last = np.maximum.accumulate(np.where(quoted, np.arange(len(values)), -1))
+            row[:] = np.where(last >= 0, values[np.maximum(last, 0)], np.nan)
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "dates.npy"), days)
+        np.save(os.path.join(path, "rates.npy"), matrix)
+        with open(os.path.join(path, "currencies.json"), "w") as file:
+            json.dump(codes, file)
+        return cls(path)
+
+    @classmethod
+    def from_csv(cls, csv_path, path):
+        """Build a store from a CSV file with date,currency,rate rows."""
+        quotes = {}
+        with open(csv_path, newline="") as file:
+            for row in csv.reader(file):
+                if not row or row[0].strip().lower() == "date":
+                    continue
+                date, code, rate = (field.strip() for field in row[:3])
+                try:
+                    quotes.setdefault(code.upper(), {})[date] = float(rate)
+                except ValueError:
+                    raise ValueError(f"Invalid data: rate '{rate}' for {code} on {date}")
+
+        dates = sorted({date for by_date in quotes.values() for date in by_date})
+        rates = {
+            code: [by_date.get(date, np.nan) for date in dates]
+            for code, by_date in quotes.items()
+        }
+        return cls.create(path, np.array(dates, dtype='datetime64[D]'), rates)
+
+    @property
+    def first_date(self):
+        return np.datetime64(int(self.days[0]), 'D')
+
+    @property
+    def last_date(self):
+        return np.datetime64(int(self.days[-1]), 'D')
+
+    def date_indices(self, dates):
+        """Positions of the latest quote on or before each date (-1 if none)."""
+        return np.searchsorted(self.days, _as_days(dates), side='right') - 1
+
+    def currency_indices(self, currencies):
+        """Map a code, an array of codes or an array of row indices to row indices."""
+        return currency_indices(currencies, self.index)
+
+    def rate(self, currency, date):
+        """Rate (units per USD) of currency as of date."""
+        position = int(self.date_indices(date))
+        if position < 0:
+            raise ValueError(f"No rates on or before {np.datetime64(date, 'D')}")
+        value = float(self.rates[self.currency_indices(currency), position])
+        if np.isnan(value):
+            raise ValueError(f"No {currency.upper()} rate on or before {np.datetime64(date, 'D')}")
+        return value
+
+    def convert(self, amounts, from_currencies, to_currencies, dates):
+        """Convert amounts between currencies at the rates as of each date.
+
+        Every argument may be a scalar or an array; arrays are converted in
+        one vectorized pass. Integer indices into codes and day numbers
+        skip the string parsing that dominates very large batches. Rows
+        dated before a currency's first quote come back as NaN.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        positions = self.date_indices(dates)
+        from_idx = self.currency_indices(from_currencies)
+        to_idx = self.currency_indices(to_currencies)
+
+        known = positions >= 0
+        positions = np.where(known, positions, 0)
+        with np.errstate(invalid='ignore'):
+            factor = self.rates[to_idx, positions] / self.rates[from_idx, positions]
+        return np.where(known, amounts * factor, np.nan)
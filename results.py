@@ -0,0 +1,59 @@
+"""Numeric conversion results and the text formats of calculator entries.
+
+The formats are shared by ConversionResult and the history store, so a
+result printed by a converter reads the same as its history entry.
+"""
+
+# ConversionResult.category of currency conversions
+CURRENCY_CATEGORY = 'Currency'
+
+def format_calculation(operation, num1, num2, result):
+    """Render a basic calculator entry, e.g. '2 + 3 = 5'."""
+    if operation == 'log':
+        return f"log base {num2} of {num1} = {result}"
+    if operation == 'ln':
+        return f"ln({num1}) = {result}"
+    if operation == '√':
+        return f"{num2}√{num1} = {result}"
+    return f"{num1} {operation} {num2} = {result}"
+
+def format_unit_conversion(category, unit_from, unit_to, value, result):
+    """Render a unit conversion entry, e.g. '10 meters = 32.8084 feet'."""
+    if category == 'Temperature':
+        return f"{value}°{unit_from[0].upper()} = {result:.4f}°{unit_to[0].upper()}"
+    return f"{value} {unit_from} = {result:.4f} {unit_to}"
+
+def format_currency_conversion(from_currency, to_currency, amount, result):
+    """Render a currency conversion entry, e.g. '10.00 USD = 8.50 EUR'."""
+    return f"{amount:.2f} {from_currency} = {result:.2f} {to_currency}"
+
+class ConversionResult:
+    """Numeric outcome of a unit or currency conversion, rendered as text on demand.
+
+    category is the unit category, or CURRENCY_CATEGORY for currencies.
+    """
+
+    __slots__ = ('category', 'unit_from', 'unit_to', 'value', 'result')
+
+    def __init__(self, category, unit_from, unit_to, value, result):
+        self.category = category
+        self.unit_from = unit_from
+        self.unit_to = unit_to
+        self.value = value
+        self.result = result
+
+    @property
+    def operation(self):
+        return f"{self.unit_from} to {self.unit_to}"
+
+    def __float__(self):
+        return float(self.result)
+
+    def __str__(self):
+        if self.category == CURRENCY_CATEGORY:
+            return format_currency_conversion(self.unit_from, self.unit_to, self.value, self.result)
+        return format_unit_conversion(self.category, self.unit_from, self.unit_to,
+                                      self.value, self.result)
+
+    def __repr__(self):
+        return f"ConversionResult({str(self)!r})"
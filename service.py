@@ -0,0 +1,351 @@
+"""Local HTTP/JSON service for the calculator and converters.
+
+Keeps one warm process so callers do not pay Python and NumPy start-up on
+every calculation. Concurrent requests to the same endpoint are coalesced
+into batches and run through the vectorized batch functions in main:
+whatever has queued up while the previous batch was running is handled in
+one call, so batches grow with load while a lone request is served at once.
+Each endpoint's queue is bounded; when it is full the server answers 503
+instead of letting latency grow without limit.
+
+Endpoints (POST a JSON object, or a list of objects for several at once):
+    /calculate          {"num1": 6, "operation": "*", "num2": 7}
+    /convert/unit       {"category": "Length", "value": 3, "choice": "Meters to Feet"}
+    /convert/currency   {"amount": 100, "from": "USD", "to": "EUR"}
+    GET /health         queue depths, batch counters and exchange-rate staleness
+
+Example:
+    python service.py --port 8765
+    python service.py --unix /tmp/calculator.sock
+    python service.py --rates rates.json --rates-ttl 60
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+from http import HTTPStatus
+
+import numpy as np
+
+from main import (
+    BASIC_OPERATIONS, basic_calculator, basic_calculator_batch,
+    unit_converter_batch, resolve_conversion, cross_rate_table,
+    use_rate_provider, rate_metrics
+)
+
+MAX_BODY_BYTES = 1 << 20
+
+class Overloaded(Exception):
+    """Raised when an endpoint's queue is full."""
+
+class RequestError(ValueError):
+    """Raised for a malformed request; reported to the client as 400."""
+
+class Batcher:
+    """Coalesces queued requests into batches for a vectorized handler.
+
+    handler takes a list of validated requests and returns one
+    ('result', value) or ('error', message) pair per request.
+    """
+
+    def __init__(self, handler, max_batch=4096, max_delay=0.0, max_pending=10000):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, request):
+        """Queue a request and return a future for its outcome."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((request, future))
+        except asyncio.QueueFull:
+            raise Overloaded() from None
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Clients that disconnected have cancelled their futures
+            batch = [(request, future) for request, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                outcomes = self.handler([request for request, _ in batch])
+            except Exception as e:
+                outcomes = [('error', str(e))] * len(batch)
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+            self.batches += 1
+            self.requests += len(batch)
+
+def _number(payload, key):
+    value = payload.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise RequestError(f"'{key}' must be a number")
+    return float(value)
+
+def _text(payload, key):
+    value = payload.get(key)
+    if not isinstance(value, str):
+        raise RequestError(f"'{key}' must be a string")
+    return value
+
+def parse_calculation(payload):
+    operation = _text(payload, 'operation')
+    if operation not in BASIC_OPERATIONS:
+        raise RequestError("Invalid operation!")
+    return _number(payload, 'num1'), operation, _number(payload, 'num2')
+
+def parse_unit_conversion(payload):
+    return _text(payload, 'category'), _number(payload, 'value'), _text(payload, 'choice')
+
+def parse_currency_conversion(payload):
+    amount = _number(payload, 'amount')
+    if amount < 0:
+        raise RequestError("Amount must be a positive number!")
+    return amount, _text(payload, 'from').upper(), _text(payload, 'to').upper()
+
+def handle_calculations(requests):
+    num1, operations, num2 = (np.array(column) for column in zip(*requests))
+    result, invalid = basic_calculator_batch(num1, operations, num2)
+    outcomes = []
+    for i, request in enumerate(requests):
+        if not invalid[i]:
+            outcomes.append(('result', float(result[i])))
+            continue
+        # Rare path: rerun the scalar version for its exact error message
+        try:
+            basic_calculator([], *request)
+            outcomes.append(('error', "Error: Result is not a finite real number!"))
+        except Exception as e:
+            outcomes.append(('error', str(e)))
+    return outcomes
+
+def handle_unit_conversions(requests):
+    groups = {}
+    for i, (category, _, choice) in enumerate(requests):
+        groups.setdefault((category, choice), []).append(i)
+
+    outcomes = [None] * len(requests)
+    for (category, choice), rows in groups.items():
+        try:
+            resolve_conversion(category, choice)
+        except ValueError as e:
+            for i in rows:
+                outcomes[i] = ('error', str(e))
+            continue
+        values = unit_converter_batch(category, [requests[i][1] for i in rows], choice)
+        for i, value in zip(rows, values.tolist()):
+            outcomes[i] = ('result', value)
+    return outcomes
+
+def handle_currency_conversions(requests):
+    table = cross_rate_table()
+    index = table['index']
+    outcomes = [None] * len(requests)
+    rows, amounts, from_idx, to_idx = [], [], [], []
+    for i, (amount, from_currency, to_currency) in enumerate(requests):
+        for code in (from_currency, to_currency):
+            if code not in index:
+                outcomes[i] = ('error', f"Unsupported currency: {code}")
+                break
+        else:
+            rows.append(i)
+            amounts.append(amount)
+            from_idx.append(index[from_currency])
+            to_idx.append(index[to_currency])
+
+    converted = np.array(amounts) * table['matrix'][from_idx, to_idx]
+    for i, value in zip(rows, converted.tolist()):
+        outcomes[i] = ('result', value)
+    return outcomes
+
+ENDPOINTS = {
+    '/calculate': (parse_calculation, handle_calculations),
+    '/convert/unit': (parse_unit_conversion, handle_unit_conversions),
+    '/convert/currency': (parse_currency_conversion, handle_currency_conversions),
+}
+
+class CalculatorService:
+    """HTTP/1.1 front end that feeds one Batcher per endpoint."""
+
+    def __init__(self, max_batch=4096, max_delay=0.0, max_pending=10000):
+        self.batchers = {
+            path: Batcher(handler, max_batch, max_delay, max_pending)
+            for path, (_, handler) in ENDPOINTS.items()
+        }
+        self._tasks = []
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        self._tasks = [asyncio.create_task(batcher.run()) for batcher in self.batchers.values()]
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'endpoints': {
+                path: {
+                    'pending': batcher.queue.qsize(),
+                    'requests': batcher.requests,
+                    'batches': batcher.batches,
+                }
+                for path, batcher in self.batchers.items()
+            },
+            'rates': rate_metrics(),
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self.dispatch(method, path, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            # Malformed requests and dropped clients just close the connection
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return HTTPStatus.OK, self.health()
+        if path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': "Body must be JSON"}
+        items = payload if isinstance(payload, list) else [payload]
+        parse, _ = ENDPOINTS[path]
+        batcher = self.batchers[path]
+
+        futures = []
+        try:
+            for item in items:
+                if not isinstance(item, dict):
+                    raise RequestError("Each request must be a JSON object")
+                futures.append(batcher.submit(parse(item)))
+        except RequestError as e:
+            for future in futures:
+                future.cancel()
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Overloaded:
+            for future in futures:
+                future.cancel()
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Server busy, retry later"}
+
+        outcomes = [dict([outcome]) for outcome in await asyncio.gather(*futures)]
+        return HTTPStatus.OK, outcomes if isinstance(payload, list) else outcomes[0]
+
+    @staticmethod
+    async def _read_request(reader):
+        """Read one HTTP request; returns None at end of stream."""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise ConnectionError("Malformed request line") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise ConnectionError("Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, target.split('?', 1)[0], body, keep_alive
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        headers = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers += "Retry-After: 1\r\n"
+        writer.write(headers.encode() + b"\r\n" + body)
+
+async def serve(host='127.0.0.1', port=8765, unix_path=None, **options):
+    service = CalculatorService(**options)
+    server = await service.start(host, port, unix_path)
+    address = unix_path or f"http://{host}:{port}"
+    print(f"Calculator service listening on {address}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the calculator and converters over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=4096, help="largest batch per call")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0,
+                        help="time to wait for a batch to fill (0 = batch only what is queued)")
+    parser.add_argument("--max-pending", type=int, default=10000,
+                        help="queued requests per endpoint before answering 503")
+    parser.add_argument("--rates", help="JSON file of exchange rates per USD, reloaded in the background")
+    parser.add_argument("--rates-ttl", type=float, default=300.0,
+                        help="seconds between reloads of the --rates file")
+    args = parser.parse_args(argv)
+
+    if args.rates:
+        from rate_providers import FileRateProvider
+        use_rate_provider(FileRateProvider(args.rates), ttl=args.rates_ttl, wait=True)
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix,
+            max_batch=args.max_batch,
+            max_delay=args.max_delay_ms / 1000,
+            max_pending=args.max_pending,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Stream large files of numbers through the unit and currency converters.
+
+Input is read in fixed-size chunks (raw binary files are memory-mapped), each
+chunk is converted in one vectorized pass and written out before the next one
+is read, so memory use stays flat regardless of file size.
+
+Example:
+    python stream_convert.py readings.csv feet.csv --category Length --choice "Meters to Feet"
+    python stream_convert.py amounts.f64 eur.f64 --format binary --from USD --to EUR
+"""
+import argparse
+import csv
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from main import unit_converter_batch, currency_converter_batch
+
+DEFAULT_CHUNK_ROWS = 65536
+
+def make_converter(category=None, choice=None, from_currency=None, to_currency=None):
+    """Return a function that converts one chunk of values."""
+    if category is not None and choice is not None:
+        # Validate the choice up front instead of on the first chunk
+        unit_converter_batch(category, [], choice)
+        return lambda chunk: unit_converter_batch(category, chunk, choice, out=chunk)
+    if from_currency is not None and to_currency is not None:
+        currency_converter_batch([], from_currency, to_currency)
+        return lambda chunk: currency_converter_batch(chunk, from_currency, to_currency)
+    raise ValueError("Specify either a unit category and choice or from/to currencies!")
+
+def _convert_binary(input_path, output_path, convert, dtype, columns, column, chunk_rows, progress):
+    """Convert one column of a raw binary file of floats, writing whole rows, chunk by chunk."""
+    if not 0 <= column < columns:
+        raise ValueError(f"Column {column} is out of range for {columns} columns!")
+    data = np.memmap(input_path, dtype=dtype, mode='r')
+    if data.size % columns:
+        raise ValueError(f"File size is not a multiple of {columns} columns!")
+    data = data.reshape(-1, columns)
+
+    rows = 0
+    with open(output_path, 'wb') as out:
+        for start in range(0, data.shape[0], chunk_rows):
+            # Copy the slice so pages of the input map can be dropped again
+            chunk = np.array(data[start:start + chunk_rows])
+            values = chunk[:, column].astype(np.float64)
+            chunk[:, column] = convert(values)
+            chunk.tofile(out)
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    del data
+    return rows
+
+def _invalid_row(fields, column, first_row):
+    """Describe the first row of a chunk whose column is missing or not a number."""
+    for number, row in enumerate(fields, start=first_row):
+        if not row:
+            continue
+        if not -len(row) <= column < len(row):
+            return ValueError(f"Invalid data in row {number}: no column {column}")
+        try:
+            float(row[column])
+        except ValueError:
+            return ValueError(f"Invalid data in row {number}: '{row[column]}' is not a number")
+    return ValueError(f"Invalid data in rows {first_row}-{first_row + len(fields) - 1}")
+
+def _convert_csv(input_path, output_path, convert, column, delimiter, header, chunk_rows, progress):
+    """Convert one column of a CSV file, replacing it in each output row.
+
+    Quoted fields are handled by the csv module, and blank lines are copied
+    through unchanged.
+    """
+    rows = 0
+    records = 0
+    with open(input_path, 'r', newline='') as src, open(output_path, 'w', newline='') as out:
+        reader = csv.reader(src, delimiter=delimiter)
+        writer = csv.writer(out, delimiter=delimiter, lineterminator='\n')
+        first_row = 1
+        if header:
+            names = next(reader, None)
+            if names is not None:
+                writer.writerow(names)
+            first_row = 2
+        while True:
+            try:
+                fields = list(itertools.islice(reader, chunk_rows))
+            except csv.Error as e:
+                raise ValueError(f"Invalid data in row {first_row + records + 1}: {str(e)}")
+            if not fields:
+                break
+            values = [row for row in fields if row]
+            try:
+                chunk = np.array([row[column] for row in values], dtype=np.float64)
+            except (IndexError, ValueError):
+                raise _invalid_row(fields, column, first_row + records)
+
+            result = convert(chunk)
+            for row, value in zip(values, result.tolist()):
+                row[column] = repr(value)
+            writer.writerows(fields)
+
+            records += len(fields)
+            rows += len(values)
+            if progress:
+                progress(rows)
+    return rows
+
+def convert_file(input_path, output_path, category=None, choice=None,
+                 from_currency=None, to_currency=None, fmt='csv', column=0,
+                 delimiter=',', header=False, dtype='float64', columns=1,
+                 chunk_rows=DEFAULT_CHUNK_ROWS, progress=None):
+    """Stream a file through a unit or currency conversion.
+
+    fmt is 'csv' or 'binary'. Binary input is a raw array of dtype values
+    with the given number of columns per row. Returns a dict with the row
+    count, elapsed seconds and throughput in rows per second.
+    """
+    if chunk_rows <= 0:
+        raise ValueError("Chunk size must be positive!")
+    convert = make_converter(category, choice, from_currency, to_currency)
+
+    start = time.perf_counter()
+    if fmt == 'binary':
+        rows = _convert_binary(input_path, output_path, convert, np.dtype(dtype),
+                               columns, column, chunk_rows, progress)
+    elif fmt == 'csv':
+        rows = _convert_csv(input_path, output_path, convert, column, delimiter,
+                            header, chunk_rows, progress)
+    else:
+        raise ValueError(f"Invalid format: {fmt}")
+    seconds = time.perf_counter() - start
+
+    return {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else float('inf'),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a file through a unit or currency conversion.")
+    parser.add_argument("input", help="input file (CSV or raw binary floats)")
+    parser.add_argument("output", help="output file, written in the same format")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "binary"], default="csv")
+    parser.add_argument("--category", help="unit category, e.g. Length")
+    parser.add_argument("--choice", help="unit conversion, e.g. 'Meters to Feet'")
+    parser.add_argument("--from", dest="from_currency", help="source currency code")
+    parser.add_argument("--to", dest="to_currency", help="target currency code")
+    parser.add_argument("--column", type=int, default=0, help="column to convert (default 0)")
+    parser.add_argument("--columns", type=int, default=1, help="columns per row in binary input")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter")
+    parser.add_argument("--header", action="store_true", help="copy the first CSV line through unchanged")
+    parser.add_argument("--dtype", default="float64", help="binary value type (float32 or float64)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--quiet", action="store_true", help="do not report progress")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def report(rows):
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        print(f"\r{rows} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+
+    try:
+        stats = convert_file(
+            args.input, args.output,
+            category=args.category, choice=args.choice,
+            from_currency=args.from_currency, to_currency=args.to_currency,
+            fmt=args.fmt, column=args.column, delimiter=args.delimiter,
+            header=args.header, dtype=args.dtype, columns=args.columns,
+            chunk_rows=args.chunk_rows, progress=None if args.quiet else report,
+        )
+    except (ValueError, OSError) as e:
+        print(f"\nError: {str(e)}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Converted {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""One-pass, mergeable statistics for data that does not fit in memory.
+
+StreamingStats consumes data chunk by chunk and keeps:
+- count, mean and variance, combined per chunk with Chan et al.'s parallel
+  form of Welford's algorithm,
+- running min and max,
+- a KLL-style compactor sketch for the median and other quantiles.
+
+Accumulators built over separate parts of the data can be merged, so the
+work can be split across files, threads or processes. parallel_stats does
+exactly that: it shards an array or binary file across a process pool,
+sharing the data through multiprocessing.shared_memory or a memory map
+instead of pickling it.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_SKETCH_SIZE = 4096
+DEFAULT_CHUNK_SIZE = 65536
+
+class StreamingStats:
+    """Mergeable accumulator for mean, variance, min, max and quantiles.
+
+    Quantiles are exact while fewer than sketch_size values have been seen
+    and approximate afterwards, with rank error shrinking as sketch_size
+    grows.
+    """
+
+    def __init__(self, sketch_size=DEFAULT_SKETCH_SIZE, seed=0):
+        if sketch_size < 2:
+            raise ValueError("Sketch size must be at least 2!")
+        self.sketch_size = sketch_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # levels[h] holds sketch items that each stand for 2**h values
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add a chunk of values (any array-like) to the accumulator."""
+        chunk = np.asarray(values, dtype=np.float64).ravel()
+        n = chunk.size
+        if n == 0:
+            return self
+
+        chunk_mean = float(chunk.mean())
+        chunk_m2 = float(np.square(chunk - chunk_mean).sum())
+        self._combine_moments(n, chunk_mean, chunk_m2)
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+
+        self._levels[0] = np.concatenate((self._levels[0], chunk))
+        self._compress()
+        return self
+
+    def consume(self, iterable, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Add every value from an iterable of numbers or of array chunks."""
+        buffer = []
+        for item in iterable:
+            if np.ndim(item) == 0:
+                buffer.append(item)
+                if len(buffer) >= chunk_size:
+                    self.update(buffer)
+                    buffer = []
+            else:
+                self.update(item)
+        if buffer:
+            self.update(buffer)
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator into this one."""
+        if other.count == 0:
+            return self
+        self._combine_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        for h, items in enumerate(other._levels):
+            if h == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[h] = np.concatenate((self._levels[h], items))
+        self._compress()
+        return self
+
+    @property
+    def var(self):
+        """Population variance, matching np.var."""
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        """Population standard deviation, matching np.std."""
+        return math.sqrt(self.var) if self.count else math.nan
+
+    def quantile(self, q):
+        """Return the q-th quantile (0 <= q <= 1) of the values seen so far."""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1!")
+        if self.count == 0:
+            return math.nan
+        if len(self._levels) == 1:
+            # Nothing has been compacted yet, so every value is still here
+            return float(np.quantile(self._levels[0], q))
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level), 2.0 ** h) for h, level in enumerate(self._levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        rank = q * cumulative[-1]
+        index = min(int(np.searchsorted(cumulative, rank)), len(items) - 1)
+        return float(items[order][index])
+
+    def percentile(self, p):
+        """Return the p-th percentile (0 <= p <= 100)."""
+        return self.quantile(p / 100)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def result(self):
+        """Return the statistics in the same form as main.statistical_analysis."""
+        return {
+            'mean': self.mean if self.count else math.nan,
+            'median': self.median,
+            'std': self.std,
+            'var': self.var,
+            'min': self.min if self.count else math.nan,
+            'max': self.max if self.count else math.nan,
+            'count': self.count,
+        }
+
+    def _combine_moments(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def _compress(self):
+        """Compact every level that is over capacity into the level above."""
+        h = 0
+        while h < len(self._levels):
+            level = self._levels[h]
+            if len(level) > self.sketch_size:
+                level = np.sort(level)
+                # An odd item out stays at this level to keep weights exact
+                keep = level[:0]
+                if len(level) % 2:
+                    keep, level = level[-1:], level[:-1]
+                promoted = level[self._rng.integers(2)::2]
+                self._levels[h] = keep
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                self._levels[h + 1] = np.concatenate((self._levels[h + 1], promoted))
+            h += 1
+
+def _open_source(source, dtype):
+    """Attach to shared memory or memory-map a file as a flat array."""
+    kind, location, size = source
+    if kind == 'shm':
+        shm = shared_memory.SharedMemory(name=location)
+        return shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+    return None, np.memmap(location, dtype=dtype, mode='r', shape=(size,))
+
+def _shard_stats(source, dtype, start, stop, sketch_size, seed, chunk_size):
+    """Worker: accumulate statistics over data[start:stop] without copying it in."""
+    shm, data = _open_source(source, dtype)
+    try:
+        stats = StreamingStats(sketch_size=sketch_size, seed=seed)
+        for offset in range(start, stop, chunk_size):
+            stats.update(data[offset:min(offset + chunk_size, stop)])
+        return stats
+    finally:
+        del data
+        if shm is not None:
+            shm.close()
+
+def parallel_stats(data=None, path=None, dtype='float64', processes=None,
+                   shards=None, sketch_size=DEFAULT_SKETCH_SIZE,
+                   chunk_size=1 << 20):
+    """Compute statistics over a large array or raw binary file on all cores.
+
+    Pass either an array-like as data or the path of a raw binary file of
+    dtype values. Arrays are copied once into shared memory; files are
+    memory-mapped by each worker. Each shard's accumulator is merged in
+    order, so moments, min and max match a single pass.
+    """
+    if (data is None) == (path is None):
+        raise ValueError("Specify either data or a file path!")
+    dtype = np.dtype(dtype)
+    processes = processes or os.cpu_count() or 1
+
+    shm = None
+    try:
+        if path is not None:
+            size = os.path.getsize(path) // dtype.itemsize
+            source = ('file', path, size)
+        else:
+            arr = np.asarray(data, dtype=dtype).ravel()
+            size = arr.size
+            shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+            np.ndarray(arr.shape, dtype=dtype, buffer=shm.buf)[:] = arr
+            source = ('shm', shm.name, size)
+
+        shards = shards or processes
+        bounds = np.linspace(0, size, shards + 1).astype(np.int64)
+        result = StreamingStats(sketch_size=sketch_size)
+        if processes == 1:
+            for i in range(shards):
+                result.merge(_shard_stats(source, dtype, int(bounds[i]), int(bounds[i + 1]),
+                                          sketch_size, i, chunk_size))
+            return result
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_shard_stats, source, dtype, int(bounds[i]), int(bounds[i + 1]),
+                            sketch_size, i, chunk_size)
+                for i in range(shards)
+            ]
+            for future in futures:
+                result.merge(future.result())
+        return result
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
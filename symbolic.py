@@ -0,0 +1,209 @@
+"""Memoizing cache for symbolic calculations.
+
+Results are keyed on the canonical form of the parsed expression, so
+equivalent inputs such as "1 + x" and "x+1" share an entry. Entries are kept
+in an in-memory LRU and, optionally, in a shelve file that persists across
+sessions and processes.
+"""
+import collections
+import threading
+
+class SymbolicCache:
+    """LRU cache of symbolic results with an optional on-disk store."""
+
+    def __init__(self, maxsize=256, path=None):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive!")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = collections.OrderedDict()
+        # Raw input string -> canonical key, so repeated inputs skip parsing
+        self._keys = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def canonical_key(self, expr_str):
+        """Return the canonical key for an expression string."""
+        with self._lock:
+            key = self._keys.get(expr_str)
+            if key is not None:
+                self._keys.move_to_end(expr_str)
+                return key
+
+        from sympy import sympify, srepr
+        key = srepr(sympify(expr_str))
+
+        with self._lock:
+            self._keys[expr_str] = key
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+        return key
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a result in memory and, if configured, on disk."""
+        with self._lock:
+            self._remember(key, value)
+        self._store(key, value)
+
+    def clear(self):
+        """Drop in-memory entries and reset the counters. The disk store is kept."""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def info(self):
+        """Return hit/miss counters and sizes as a dict."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'path': self.path,
+            }
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _load(self, key):
+        if not self.path:
+            return None
+        import shelve
+        try:
+            with shelve.open(self.path, flag='r') as db:
+                return db.get(key)
+        except Exception:
+            # A missing or unreadable store behaves like an empty one
+            return None
+
+    def _store(self, key, value):
+        if not self.path:
+            return
+        import shelve
+        try:
+            with shelve.open(self.path) as db:
+                db[key] = value
+        except Exception:
+            pass
+
+# Values evaluated per chunk by CompiledExpression, bounding temporary memory
+DEFAULT_EVAL_CHUNK = 1 << 18
+
+FORMS = ('function', 'derivative', 'integral')
+
+class CompiledExpression:
+    """An expression in x with NumPy-vectorized evaluators for it, its
+    derivative and its integral. Each form is compiled on first use."""
+
+    def __init__(self, expr_str):
+        from sympy import symbols, sympify
+        self.x = symbols('x')
+        self.expr = sympify(expr_str)
+        self._functions = {}
+
+    def symbolic(self, which='function'):
+        """Return the sympy expression for one of FORMS."""
+        from sympy import Integral, diff, integrate
+        if which == 'function':
+            return self.expr
+        if which == 'derivative':
+            return diff(self.expr, self.x)
+        if which == 'integral':
+            integral = integrate(self.expr, self.x)
+            if integral.has(Integral):
+                raise ValueError("Integral has no closed form to evaluate")
+            return integral
+        raise ValueError(f"Invalid form: {which}")
+
+    def function(self, which='function'):
+        """Return the compiled NumPy callable for one of FORMS."""
+        func = self._functions.get(which)
+        if func is None:
+            from sympy import lambdify
+            expr = self.symbolic(which)
+            free = expr.free_symbols - {self.x}
+            if free:
+                names = ", ".join(sorted(str(symbol) for symbol in free))
+                raise ValueError(f"Expression has variables other than x: {names}")
+            func = lambdify(self.x, expr, modules='numpy')
+            self._functions[which] = func
+        return func
+
+    def chunks(self, x=None, x_range=None, which='function', chunk_size=DEFAULT_EVAL_CHUNK):
+        """Yield (x_chunk, y_chunk) pairs over x values or a (start, stop, count) range.
+
+        A range is generated chunk by chunk, so memory stays bounded by
+        chunk_size however many points are evaluated.
+        """
+        import numpy as np
+        func = self.function(which)
+        if x_range is not None:
+            start, stop, count = x_range
+            count = int(count)
+            step = (stop - start) / (count - 1) if count > 1 else 0.0
+            total = count
+        else:
+            values = np.asarray(x, dtype=np.float64).ravel()
+            total = values.size
+
+        for offset in range(0, total, chunk_size):
+            end = min(offset + chunk_size, total)
+            if x_range is not None:
+                x_chunk = start + step * np.arange(offset, end, dtype=np.float64)
+            else:
+                x_chunk = values[offset:end]
+            with np.errstate(all='ignore'):
+                y_chunk = func(x_chunk)
+            # Constant expressions come back as scalars
+            yield x_chunk, np.broadcast_to(np.asarray(y_chunk, dtype=np.float64), x_chunk.shape)
+
+    def evaluate(self, x=None, x_range=None, which='function',
+                 chunk_size=DEFAULT_EVAL_CHUNK, out=None):
+        """Evaluate into a float64 array (or out), chunk by chunk."""
+        import numpy as np
+        total = int(x_range[2]) if x_range is not None else np.size(x)
+        if out is None:
+            out = np.empty(total, dtype=np.float64)
+        position = 0
+        for _, y_chunk in self.chunks(x, x_range, which, chunk_size):
+            out[position:position + len(y_chunk)] = y_chunk
+            position += len(y_chunk)
+        if x is not None and x_range is None:
+            return out.reshape(np.shape(x))
+        return out
+
+_COMPILED = SymbolicCache(maxsize=64)
+
+def compile_expression(expr_str):
+    """Return the CompiledExpression for expr_str, compiling it at most once."""
+    key = _COMPILED.canonical_key(expr_str)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        compiled = CompiledExpression(expr_str)
+        _COMPILED.put(key, compiled)
+    return compiled
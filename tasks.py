@@ -0,0 +1,216 @@
+"""Run long calculations in a background worker process for the GUI.
+
+Results are delivered back on the Tk main thread by polling with
+root.after, so callbacks can safely update widgets.
+"""
+import importlib
+import multiprocessing
+
+import instrumentation
+
+def _worker_loop(conn, preload=(), warmup=None):
+    """Import the preload modules and run the warmup job, if any, then run jobs
+    received over conn until the parent closes the pipe.
+
+    When the parent has instrumentation enabled, the statistics recorded for
+    a job are sent back with its result so they show up in the parent.
+    """
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    if warmup is not None:
+        func, args = warmup
+        try:
+            func(*args)
+        except Exception:
+            pass
+    while True:
+        try:
+            job_id, func, args, instrumented = conn.recv()
+        except (EOFError, OSError):
+            break
+        if instrumented:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+        try:
+            ok, value = True, func(*args)
+        except Exception as e:
+            # Send only the message; arbitrary exceptions may not pickle
+            ok, value = False, str(e)
+        conn.send((job_id, ok, value, instrumentation.drain() if instrumented else None))
+
+class TaskRunner:
+    """Run one job at a time in a worker process polled from the Tk event loop.
+
+    start() launches the worker ahead of the first job, and it imports the
+    preload modules (SymPy, NumPy...) and runs the warmup (func, args) job
+    while idle, so the first calculation does not pay for them. A worker that completes a job is kept, together
+    with the caches it has built. A running SymPy or NumPy call cannot be
+    interrupted, so cancelling or replacing a job terminates its worker; with
+    spare=True a second worker is kept warm to take over at once, and a new
+    spare is started in its place. Terminated workers are reaped from the
+    event loop, so the GUI never waits for one to exit.
+    """
+
+    POLL_MS = 50
+    REAP_MS = 200
+
+    def __init__(self, root, preload=(), warmup=None, spare=False):
+        self.root = root
+        self.preload = tuple(preload)
+        self.warmup = warmup
+        self.spare = spare
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._spare = None
+        self._stopping = []
+        self._job_id = 0
+        self._pending = None
+        self._after_id = None
+        self._reap_id = None
+
+    @property
+    def busy(self):
+        """True while a submitted job has not delivered its result."""
+        return self._pending is not None
+
+    def start(self):
+        """Start the worker, and the spare if wanted, without waiting for them."""
+        if self._process is None or not self._process.is_alive():
+            self._stop_worker()
+            if self._spare is not None and self._spare[0].is_alive():
+                self._process, self._conn = self._spare
+            else:
+                self._retire(self._spare)
+                self._process, self._conn = self._spawn()
+            self._spare = None
+        if self.spare and (self._spare is None or not self._spare[0].is_alive()):
+            self._retire(self._spare)
+            self._spare = self._spawn()
+
+    def submit(self, func, args=(), on_done=None, on_error=None):
+        """Run func(*args) in the worker, replacing any job still running.
+
+        on_done receives the result and on_error the error message; both are
+        called on the Tk main thread. func must be a module-level function so
+        it can be sent to the worker process.
+        """
+        if self.busy:
+            self.cancel()
+        self.start()
+        self._job_id += 1
+        self._pending = (self._job_id, on_done, on_error)
+        self._conn.send((self._job_id, func, tuple(args), instrumentation.is_enabled()))
+        self._schedule_poll()
+        return self._job_id
+
+    def cancel(self):
+        """Cancel the running job. Returns False if nothing was running."""
+        if self._pending is None:
+            return False
+        self._pending = None
+        self._cancel_poll()
+        self._stop_worker()
+        # Bring the spare in, or start warming a new worker for the next job
+        self.start()
+        return True
+
+    def shutdown(self):
+        """Cancel any running job and stop the worker processes."""
+        self._pending = None
+        self._cancel_poll()
+        self._stop_worker()
+        self._retire(self._spare)
+        self._spare = None
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_loop, args=(child_conn, self.preload, self.warmup), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _stop_worker(self):
+        if self._process is not None:
+            self._retire((self._process, self._conn))
+        self._process = None
+        self._conn = None
+
+    def _retire(self, worker):
+        """Terminate a worker and leave it to be reaped by _reap."""
+        if worker is None:
+            return
+        process, conn = worker
+        if process.is_alive():
+            process.terminate()
+        conn.close()
+        self._stopping.append(process)
+        self._schedule_reap()
+
+    def _schedule_reap(self):
+        if self._reap_id is None:
+            try:
+                self._reap_id = self.root.after(self.REAP_MS, self._reap)
+            except Exception:
+                # The window is gone; daemon workers exit with the application
+                pass
+
+    def _reap(self):
+        self._reap_id = None
+        # is_alive() collects a process that has exited without blocking
+        self._stopping = [process for process in self._stopping if process.is_alive()]
+        if self._stopping:
+            self._schedule_reap()
+
+    def _schedule_poll(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.POLL_MS, self._poll)
+
+    def _cancel_poll(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _poll(self):
+        self._after_id = None
+        if self._pending is None:
+            return
+        job_id, on_done, on_error = self._pending
+
+        try:
+            ready = self._conn.poll()
+            message = self._conn.recv() if ready else None
+        except (EOFError, OSError):
+            ready, message = True, (job_id, False, "Worker process exited unexpectedly", None)
+
+        if not ready:
+            if not self._process.is_alive():
+                message = (job_id, False, "Worker process exited unexpectedly", None)
+            else:
+                self._schedule_poll()
+                return
+
+        result_id, ok, value, stats = message
+        if stats:
+            instrumentation.merge(stats)
+        if result_id != job_id:
+            # Result of a job that was replaced; keep waiting for ours
+            self._schedule_poll()
+            return
+
+        self._pending = None
+        if not ok and not self._process.is_alive():
+            self._stop_worker()
+            self.start()
+        callback = on_done if ok else on_error
+        if callback is not None:
+            callback(value)
@@ -0,0 +1,41 @@
+"""Exported history matches the entries View History shows."""
+import pytest
+
+import main
+from history_store import COMPACT_FACTOR, History, HistoryJournal
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read().splitlines()
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_export_after_reload_holds_only_the_ring(tmp_path, binary):
+    path = str(tmp_path / "history.journal")
+    journal = HistoryJournal(path, binary=binary)
+    writer = History(capacity=100, journal=journal)
+    for i in range(150):
+        main.basic_calculator(writer, i, '+', 1)
+    journal.close()
+
+    # The journal keeps all 150 entries (under COMPACT_FACTOR * capacity)
+    assert 150 <= COMPACT_FACTOR * 100
+    history = History.from_journal(HistoryJournal(path, binary=binary), capacity=100)
+    exported = str(tmp_path / "export.txt")
+    main.export_history(history, exported)
+    assert read_lines(exported) == list(history)
+    assert len(read_lines(exported)) == 100
+
+def test_export_copies_a_matching_journal(tmp_path):
+    path = str(tmp_path / "history.journal")
+    history = History.from_journal(HistoryJournal(path), capacity=10)
+    for i in range(5):
+        main.basic_calculator(history, i, '*', 2)
+    exported = str(tmp_path / "export.txt")
+    main.export_history(history, exported)
+    assert read_lines(exported) == list(history)
+
+    for i in range(10):
+        main.basic_calculator(history, i, '-', 1)
+    main.export_history(history, exported)
+    assert read_lines(exported) == list(history)
+    assert len(read_lines(exported)) == 10
@@ -0,0 +1,35 @@
+"""Labels recorded by the instrumentation of main's core functions."""
+import pytest
+
+import instrumentation
+import main
+
+@pytest.fixture
+def recording():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def labels(name):
+    return {label for function, label in instrumentation._stats if function == name}
+
+def test_currency_labels_are_normalized(recording):
+    main.currency_converter([], 5, "usd", "eur")
+    main.currency_converter([], 5, "USD", "EUR")
+    for pair in (("xxx", "eur"), ("usd", "???"), (1, "eur")):
+        with pytest.raises(Exception):
+            main.currency_converter([], 5, *pair)
+    assert labels("currency_converter") == {"USD->EUR", instrumentation.INVALID_LABEL}
+
+def test_invalid_operations_and_categories_share_a_label(recording):
+    main.basic_calculator([], 1, "+", 2)
+    for operation in ("bogus", "nope", ["+"]):
+        with pytest.raises(ValueError):
+            main.basic_calculator([], 1, operation, 2)
+    main.unit_converter([], "Length", 1, "Meters to Feet")
+    with pytest.raises(ValueError):
+        main.unit_converter([], "Time", 1, "Seconds to Hours")
+    assert labels("basic_calculator") == {"+", instrumentation.INVALID_LABEL}
+    assert labels("unit_converter") == {"Length", instrumentation.INVALID_LABEL}
@@ -0,0 +1,94 @@
+"""Exact rounding and int64 edge cases of the minor-unit currency conversion."""
+import random
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+import main
+
+INT64_MIN, INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+DECIMAL_ROUNDING = {'half_even': ROUND_HALF_EVEN, 'half_up': ROUND_HALF_UP, 'down': ROUND_DOWN}
+
+def exact(amount, num, den, rounding):
+    """amount * num / den rounded with Python integers, or None if it overflows int64."""
+    value = _rounded(amount * num, den, rounding)
+    return value if INT64_MIN <= value <= INT64_MAX else None
+
+def _rounded(numerator, den, rounding):
+    base, remainder = divmod(numerator, den)
+    if rounding == 'down':
+        return base + (1 if remainder and base < 0 else 0)
+    if 2 * remainder > den:
+        return base + 1
+    if 2 * remainder == den:
+        if rounding == 'half_even':
+            return base + (base & 1)
+        return base + (1 if base >= 0 else 0)
+    return base
+
+def divide(amounts, num, den, rounding):
+    return main._divide_rounded(np.array(amounts, dtype=np.int64), np.int64(num),
+                                np.int64(den), rounding)
+
+@pytest.mark.parametrize("rounding", main.ROUNDING_MODES)
+def test_halves(rounding):
+    amounts = [-5, -3, -1, 1, 3, 5]
+    expected = [exact(a, 1, 2, rounding) for a in amounts]
+    assert divide(amounts, 1, 2, rounding).tolist() == expected
+
+def test_halves_follow_decimal():
+    amounts = [-5, -3, -1, 1, 3, 5]
+    for rounding, mode in DECIMAL_ROUNDING.items():
+        expected = [int((Decimal(a) / 2).quantize(Decimal(1), rounding=mode)) for a in amounts]
+        assert divide(amounts, 1, 2, rounding).tolist() == expected
+
+@pytest.mark.parametrize("rounding", main.ROUNDING_MODES)
+@pytest.mark.parametrize("num, den", [(17, 20), (82, 1), (1, 82), (365, 410), (3, 2), (1, 2 ** 40)])
+def test_matches_integer_arithmetic(num, den, rounding):
+    rng = random.Random(num * 1000 + den)
+    amounts = [INT64_MIN, INT64_MIN + 1, -1, 0, 1, INT64_MAX - 1, INT64_MAX]
+    amounts += [rng.randint(INT64_MIN, INT64_MAX) for _ in range(200)]
+    amounts += [rng.randint(-10 ** 6, 10 ** 6) for _ in range(200)]
+    for amount in amounts:
+        expected = exact(amount, num, den, rounding)
+        if expected is None:
+            with pytest.raises(ValueError):
+                divide([amount], num, den, rounding)
+        else:
+            assert int(divide([amount], num, den, rounding)[0]) == expected, amount
+
+@pytest.mark.parametrize("num, den", [(3, 2), (5, 4), (82, 1), (7, 3)])
+def test_overflow_edges(num, den):
+    # Amounts whose exact result lands on either side of the int64 bounds
+    for bound in (INT64_MAX, INT64_MIN):
+        centre = bound * den // num
+        for amount in range(centre - 3 * den, centre + 3 * den + 1):
+            if not INT64_MIN <= amount <= INT64_MAX:
+                continue
+            for rounding in main.ROUNDING_MODES:
+                expected = exact(amount, num, den, rounding)
+                if expected is None:
+                    with pytest.raises(ValueError):
+                        divide([amount], num, den, rounding)
+                else:
+                    assert int(divide([amount], num, den, rounding)[0]) == expected
+
+def test_same_currency_keeps_extremes():
+    amounts = np.array([INT64_MIN, -1, 0, INT64_MAX], dtype=np.int64)
+    assert main.currency_converter_minor(amounts, "USD", "USD").tolist() == amounts.tolist()
+    mixed = main.currency_converter_minor(amounts, ["USD", "EUR", "USD", "GBP"],
+                                          ["USD", "EUR", "EUR", "GBP"])
+    assert mixed.tolist() == [INT64_MIN, -1, 0, INT64_MAX]
+
+def test_too_large_is_rejected():
+    with pytest.raises(ValueError):
+        main.currency_converter_minor(np.array([INT64_MAX]), "USD", "INR")
+    with pytest.raises(ValueError):
+        main.currency_converter_minor(np.array([INT64_MIN]), "USD", "INR")
+
+def test_numpy_float_rates(monkeypatch):
+    rates = {code: np.float64(rate) for code, rate in main.EXCHANGE_RATES.items()}
+    monkeypatch.setattr(main, "EXCHANGE_RATES", rates)
+    assert main.currency_converter_minor(np.array([100]), "USD", "EUR").tolist() == [85]
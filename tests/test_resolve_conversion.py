@@ -0,0 +1,20 @@
+"""Resolution and caching of unit conversion choices."""
+import pytest
+
+import main
+
+def test_spellings_share_one_entry(monkeypatch):
+    monkeypatch.setattr(main, "_CONVERSION_CACHE", {})
+    expected = main.resolve_conversion("Length", "Meters to Feet")
+    for choice in ("meters to feet", " METERS  to Feet ", "Meters to feet"):
+        assert main.resolve_conversion("Length", choice) == expected
+    assert list(main._CONVERSION_CACHE) == [("Length", "meters", "feet")]
+
+def test_invalid_choices_are_not_cached(monkeypatch):
+    monkeypatch.setattr(main, "_CONVERSION_CACHE", {})
+    for choice in ("Meters to Parsecs", "Feet", "Celsius to Feet"):
+        with pytest.raises(ValueError):
+            main.resolve_conversion("Length", choice)
+    with pytest.raises(ValueError):
+        main.resolve_conversion("Time", "Seconds to Hours")
+    assert main._CONVERSION_CACHE == {}